@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# benchmark.py
+
+import argparse
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.benchmark import compare, load_results, run_matrix, save_results
+
+def int_list(value):
+    return [int(v) for v in value.split(',')]
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Time backtest stages on synthetic stores')
+    parser.add_argument('-d', dest='directory', action='store', default='/tmp/greyhound-bench',
+                        help='where synthetic stores are written')
+    parser.add_argument('-b', dest='bars', action='store', type=int_list, default=[1000, 5000],
+                        help='comma separated history lengths')
+    parser.add_argument('-n', dest='symbols', action='store', type=int_list, default=[10, 50],
+                        help='comma separated universe sizes')
+    parser.add_argument('-t', dest='strategies', action='store', default='ema,macd')
+    parser.add_argument('-e', dest='engine', action='store', default='vector')
+    parser.add_argument('-r', dest='repeat', action='store', type=int, default=3)
+    parser.add_argument('-o', dest='output', action='store', default=None,
+                        help='write results to this json file')
+    parser.add_argument('--compare', dest='compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two result files instead of running')
+    parser.add_argument('--threshold', dest='threshold', action='store', type=float, default=0.2,
+                        help='slowdown ratio flagged as a regression')
+    return parser.parse_args()
+
+def display_row(row):
+    print(f"{row['stage']:>10} {row['strategy']:>5} {row['bars']:>7} bars x {row['symbols']:>4} symbols "
+          f"{row['seconds']:9.4f}s {row['us_per_bar']:8.3f} us/bar")
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    if args.compare:
+        report = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        print(report.to_string(index=False))
+        regressions = report.regression.sum()
+        print(f"{regressions} regressions")
+        sys.exit(1 if regressions else 0)
+
+    os.makedirs(args.directory, exist_ok=True)
+    results = run_matrix(args.directory, args.bars, args.symbols, args.strategies.split(','),
+                         args.engine, args.repeat, callback=display_row)
+    if args.output:
+        save_results(results, args.output)
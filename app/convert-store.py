@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# convert-store.py
+
+import argparse
+import sys
+import os
+import pandas as pd
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.datasource import NpySource, load_many
+from greyhound.utils import read_config
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Copy the HDF5 store into the memory mapped npy store')
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-f', dest='ticker_file', action='store', default=None,
+                        help='symbols to copy (default every key in the store)')
+    parser.add_argument('-o', dest='npy_dir', action='store', default=None,
+                        help='npy store directory (default [data_source] npy_dir)')
+    return parser.parse_args()
+
+def read_ticker_file(ticker_file):
+    symbols = []
+    with open(ticker_file, 'r') as fh:
+        lines = fh.readlines()
+        for line in lines:
+            symbols.append(line.rstrip().lower())
+    return symbols
+
+if __name__ == '__main__':
+    args = cli_args()
+    config = read_config(args.config)['data_source']
+    hdf5_file = os.path.expanduser(config['hdf5_file'])
+
+    if args.ticker_file:
+        symbols = read_ticker_file(args.ticker_file)
+    else:
+        with pd.HDFStore(hdf5_file, mode='r') as store:
+            symbols = [k.lstrip('/') for k in store.keys()]
+
+    target = NpySource({'npy_dir': args.npy_dir or config['npy_dir']})
+    def convert(symbol, ohlc):
+        target.write(symbol, ohlc)
+        print(f"{symbol}: {len(ohlc)} bars")
+
+    load_many(hdf5_file, symbols, post=convert)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# ingest-csv.py
+
+import argparse
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.ingest import ingest
+from greyhound.utils import read_config
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Load a directory of <symbol>.csv files into the HDF5 store')
+    parser.add_argument('-d', dest='csv_dir', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-o', dest='store', action='store', default=None,
+                        help='HDF5 file to write (default [data_source] hdf5_file)')
+    parser.add_argument('-w', dest='workers', action='store', type=int, default=None)
+    parser.add_argument('--replace', dest='replace', action='store_true',
+                        help='rewrite symbols instead of appending newer bars')
+    return parser.parse_args()
+
+def display_row(row):
+    if row['error'] is not None:
+        print(f"{row['symbol']} failed: {row['error']}")
+        return
+    print(f"{row['symbol']} read {row['rows']}, dropped {row['invalid']} invalid and "
+          f"{row['duplicates']} duplicate bars, wrote {row['written']}")
+
+if __name__ == '__main__':
+    args = cli_args()
+    config = read_config(args.config)
+    _config = config.get('ingest', {})
+
+    summary = ingest(args.csv_dir, args.store or config['data_source']['hdf5_file'],
+                     workers=args.workers, replace=args.replace,
+                     chunksize=_config.get('chunksize', 100000),
+                     complib=_config.get('complib', 'blosc:zstd'),
+                     complevel=_config.get('complevel', 5),
+                     callback=display_row)
+
+    failed = summary.error.notna().sum()
+    print(f"{len(summary)} symbols ({failed} failed), {int(summary.written.sum())} bars written")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# live-paper-trade.py
+
+import argparse
+import locale
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Simulation
+from greyhound import Stock
+from greyhound.streaming import create_streaming, read_bars, replay_frame
+
+locale.setlocale(locale.LC_ALL, 'en_US')
+
+DATE_START = '2014-01-01'
+DATE_END   = '2021-06-30'
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Paper trade a bar feed one bar at a time')
+    parser.add_argument('-s', dest='symbol', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-t', dest='strategy', action='store', default='ema')
+    parser.add_argument('-d', dest='cutoff', action='store', default=DATE_END,
+                        help='history is loaded up to this date, later bars are streamed')
+    parser.add_argument('-i', dest='feed', action='store', default=None,
+                        help='CSV bar feed (date,open,high,low,close,...); default replays the store')
+    parser.add_argument('-F', dest='follow', action='store_true',
+                        help='keep reading the feed as it grows')
+    return parser.parse_args()
+
+def display_bar(ticker, trade_date):
+    pnl = locale.currency(ticker.calc_pnl(), grouping=True)
+    print(f"{ticker.symbol} {trade_date} held/pnl: {ticker.get_held_shares()}/{pnl}")
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    symbol = args.symbol.lower()
+    stock = Stock(symbol, DATE_START, args.cutoff, config=args.config)
+    strategy = create_streaming(stock, args.strategy)
+    Simulation(stock).stream(strategy)
+
+    if args.feed:
+        feed = read_bars(args.feed, follow=args.follow)
+    else:
+        replay = Stock(symbol, args.cutoff, None, config=args.config)
+        feed = replay_frame(replay.ohlc)
+
+    last_date = stock.ohlc.index[-1]
+    for trade_date, bar in feed:
+        if trade_date <= last_date:
+            continue
+        stock.push_bar(trade_date, **bar)
+        last_date = trade_date
+        display_bar(stock, trade_date)
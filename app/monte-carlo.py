@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# monte-carlo.py
+
+import argparse
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import MonteCarlo
+from greyhound import Stock
+
+DATE_START = '2014-01-01'
+DATE_END   = '2021-06-30'
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Block bootstrap robustness check')
+    parser.add_argument('-s', dest='symbol', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-t', dest='strategy', action='store', default='ema')
+    parser.add_argument('-n', dest='n_paths', action='store', type=int, default=None)
+    parser.add_argument('-b', dest='block_size', action='store', type=int, default=None)
+    parser.add_argument('-o', dest='output', action='store', default=None,
+                        help='write the result of every path to this csv')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    stock = Stock(args.symbol.lower(), DATE_START, DATE_END, config=args.config)
+    results = MonteCarlo(stock, args.strategy, n_paths=args.n_paths, block_size=args.block_size).run()
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(results.describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95]).T.to_string())
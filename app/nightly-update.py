@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# nightly-update.py
+
+import argparse
+import locale
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.checkpoint import CheckpointStore
+from greyhound.utils import read_config
+
+locale.setlocale(locale.LC_ALL, 'en_US')
+
+DATE_START = '2014-01-01'
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Bring checkpointed backtests up to date')
+    parser.add_argument('-f', dest='ticker_file', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-t', dest='strategy', action='store', default='ema')
+    parser.add_argument('-d', dest='checkpoint_dir', action='store', default=None,
+                        help='checkpoint directory (default from config)')
+    return parser.parse_args()
+
+def read_ticker_file(ticker_file):
+    symbols = []
+    with open(ticker_file, 'r') as fh:
+        lines = fh.readlines()
+        for line in lines:
+            symbols.append(line.rstrip().lower())
+    return symbols
+
+if __name__ == '__main__':
+    args = cli_args()
+    config = read_config(args.config)
+
+    if args.checkpoint_dir:
+        checkpoints = CheckpointStore(args.checkpoint_dir)
+    else:
+        checkpoints = CheckpointStore.from_config(config)
+    if checkpoints is None:
+        sys.exit("no checkpoint directory, set [checkpoint] directory or use -d")
+
+    for symbol in read_ticker_file(args.ticker_file):
+        try:
+            stock = checkpoints.update(symbol, args.strategy, config, DATE_START)
+        except Exception as e:
+            print(f"{symbol} failed: {e}")
+            continue
+        pnl = locale.currency(stock.calc_pnl(), grouping=True)
+        max_draw = locale.currency(stock.get_max_drawdown(), grouping=True)
+        print(f"{symbol} {stock.ledger.index[-1].date()} pnl/max-draw: {pnl}/{max_draw}")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# param-sweep.py
+
+import argparse
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import ParameterSweep
+from greyhound.utils import read_config
+
+DATE_START = '2014-01-01'
+DATE_END   = '2021-06-30'
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Strategy parameter sweep')
+    parser.add_argument('-f', dest='ticker_file', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-s', dest='strategy', action='store', default='ema')
+    parser.add_argument('-p', dest='processes', action='store', type=int, default=None)
+    parser.add_argument('-o', dest='output', action='store', default=None)
+    return parser.parse_args()
+
+def read_ticker_file(ticker_file):
+    symbols = []
+    with open(ticker_file, 'r') as fh:
+        lines = fh.readlines()
+        for line in lines:
+            symbols.append(line.rstrip().lower())
+    return symbols
+
+if __name__ == '__main__':
+    args = cli_args()
+    config = read_config(args.config)
+    grid = config['sweep'][args.strategy]
+
+    sweep = ParameterSweep(read_ticker_file(args.ticker_file), DATE_START, DATE_END,
+                           args.strategy, grid, config=config)
+    results = sweep.run(args.processes)
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
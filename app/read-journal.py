@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# read-journal.py
+
+import argparse
+import locale
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.journal import read_journal
+
+locale.setlocale(locale.LC_ALL, 'en_US')
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Print a trade event journal')
+    parser.add_argument('-j', dest='journal', action='store', required=True,
+                        help='journal file, or directory of journal files')
+    parser.add_argument('-s', dest='symbol', action='store', default=None)
+    parser.add_argument('-e', dest='event', action='store', default=None,
+                        help='risk_check or trade')
+    parser.add_argument('--trades-only', dest='trades_only', action='store_true',
+                        help='skip trades of zero shares')
+    parser.add_argument('-o', dest='output', action='store', default=None,
+                        help='write the events to this csv file instead of printing them')
+    return parser.parse_args()
+
+def display_event(row):
+    symbol = row.symbol.upper()
+    if row.event == 'risk_check':
+        print(f"{row.date} {symbol}  Allowed risk: ${locale.format_string('%.2f', row.risk, grouping=True)}, "
+              f"size {row.shares:g}")
+    else:
+        print(f"{row.date} {symbol} traded {row.shares:g} @ {row.price}")
+
+if __name__ == '__main__':
+    args = cli_args()
+
+    events = read_journal(args.journal)
+    if args.symbol:
+        events = events[events.symbol == args.symbol.lower()]
+    if args.event:
+        events = events[events.event == args.event]
+    if args.trades_only:
+        events = events[(events.event != 'trade') | (events.shares != 0)]
+
+    if args.output:
+        events.to_csv(args.output, index=False)
+    else:
+        for row in events.itertuples():
+            display_event(row)
@@ -8,9 +8,7 @@ import os
 
 app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
 sys.path.append(app_path)
-from greyhound import Simulation
-from greyhound import StrategyFactory
-from greyhound import Stock
+from greyhound import Universe
 
 locale.setlocale(locale.LC_ALL, 'en_US')
 
@@ -21,6 +19,7 @@ def cli_args():
     parser = argparse.ArgumentParser(description='MuliProc Dogger')
     parser.add_argument('-s', dest='symbol', action='store', required=True)
     parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-t', dest='strategy', action='store', default='ema')
     return parser.parse_args()
 
 def display_pnl(ticker):
@@ -32,12 +31,10 @@ def display_pnl(ticker):
 if __name__ == '__main__':
     args = cli_args()
 
-    ticker = Stock(args.symbol, DATE_START, DATE_END, config='../config.toml')
+    symbol = args.symbol.lower()
+    universe = Universe([symbol], DATE_START, DATE_END, config=args.config)
+    result = universe.run_backtest(args.strategy, backend='serial')[symbol]
+    if result.error is not None:
+        sys.exit(f"{symbol} failed: {result.error}")
 
-    strat_factory = StrategyFactory()
-    signal_name = 'ema'
-    strat_factory.create_strategy(ticker, signal_name)
-    sim = Simulation(ticker)
-    sim.paper_trade(signal_name)
-
-    display_pnl(ticker)
\ No newline at end of file
+    display_pnl(universe.stocks[symbol])
\ No newline at end of file
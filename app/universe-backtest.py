@@ -3,15 +3,16 @@
 
 import argparse
 import locale
-import multiprocessing as mp
 import sys
 import os
+import numpy as np
 
 app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
 sys.path.append(app_path)
-from greyhound import Simulation
-from greyhound import StrategyFactory
+from greyhound import ResultCollector
 from greyhound import Universe
+from greyhound.instrument import instruments
+from greyhound.utils import read_config
 
 locale.setlocale(locale.LC_ALL, 'en_US')
 
@@ -22,6 +23,16 @@ def cli_args():
     parser = argparse.ArgumentParser(description='MuliProc Dogger')
     parser.add_argument('-f', dest='ticker_file', action='store', required=True)
     parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-t', dest='strategy', action='store', default='ema')
+    parser.add_argument('-b', dest='backend', action='store', default=None,
+                        help='serial, thread or process (default from config)')
+    parser.add_argument('-w', dest='workers', action='store', type=int, default=None)
+    parser.add_argument('-r', dest='max_resident', action='store', type=int, default=None,
+                        help='load stocks lazily, keeping at most this many in memory')
+    parser.add_argument('-l', dest='ledger_dir', action='store', default=None,
+                        help='write each symbol\'s packed trade ledger to this directory')
+    parser.add_argument('-m', dest='report', action='store', default=None,
+                        help='time each stage and write the report here (.json, or .prom for Prometheus)')
     return parser.parse_args()
 
 def read_ticker_file(ticker_file):
@@ -32,51 +43,49 @@ def read_ticker_file(ticker_file):
             symbols.append(line.rstrip().lower())
     return symbols
 
-def queue_count(stock_list):
-    # MP-Queue count must be no greater than amount of tickers being
-    # analyzed. Return lesser of ticker count or processor count.
-    if len(stock_list) < mp.cpu_count():
-        return len(stock_list)
-    return mp.cpu_count()
-
-def worker(wq, rq):
-    strat_factory = StrategyFactory()
-    while True:
-        stock = wq.get()
-        if stock is None:
-            wq.task_done()
-            break
-        signal_name = 'ema'
-        strat_factory.create_strategy(stock, signal_name)
-        sim = Simulation(stock)
-        sim.paper_trade(signal_name)
-        rq.put(sim.stock)
+def display_result(result, collector):
+    if result.error is not None:
+        print(f"{collector.progress()} {result.symbol} failed: {result.error}")
+        return
+    pnl = locale.currency(result.pnl, grouping=True)
+    max_draw = locale.currency(result.max_drawdown, grouping=True)
+    print(f"{collector.progress()} {result.symbol} pnl/max-draw: {pnl}/{max_draw}")
+
+def display_summary(collector):
+    summary = collector.summary()
+    pnl = locale.currency(summary['pnl'], grouping=True)
+    max_draw = locale.currency(summary['max_drawdown'], grouping=True)
+    print(f"{summary['symbols']} symbols ({summary['failed']} failed), {summary['trades']} trades, "
+          f"{summary['bars']} bars in {summary['elapsed']:.1f}s "
+          f"({summary['symbols_per_sec']:.1f} sym/s)")
+    print(f"basket pnl/worst-draw: {pnl}/{max_draw}")
 
 if __name__ == '__main__':
     args = cli_args()
+    if args.ledger_dir:
+        os.makedirs(args.ledger_dir, exist_ok=True)
 
-    universe = Universe(read_ticker_file(args.ticker_file),
-                        DATE_START, DATE_END, config=args.config)
-
-    NUM_QUEUES = queue_count(universe.stocks)
-
-    work_queue = mp.JoinableQueue()
-    result_queue = mp.Queue()	
+    config = read_config(args.config)
+    if args.report:
+        # through the config, so process pool workers time their stages too
+        config.setdefault('instrument', {})['enabled'] = True
+    instruments.configure(config)
 
-    for ticker, stock_obj in universe.stocks.items():
-        work_queue.put(stock_obj)
-    for _ in range(NUM_QUEUES):
-        work_queue.put(None)
-
-    for _ in range(NUM_QUEUES):
-        p = mp.Process(target=worker, args=(work_queue, result_queue))
-        p.start()
-
-    for stock_name, stock_obj in universe.stocks.items():
-        result = result_queue.get()
-        universe.stocks[result.symbol] = result
-
-    for k,v in universe.stocks.items():
-        pnl = locale.currency(v.calc_pnl(), grouping=True)
-        max_draw = locale.currency(v.get_max_drawdown(), grouping=True)
-        print(f"{k} pnl/max-draw: {pnl}/{max_draw}")
+    lazy = {'lazy': True, 'max_resident': args.max_resident} if args.max_resident else {}
+    universe = Universe(read_ticker_file(args.ticker_file),
+                        DATE_START, DATE_END, config=config, **lazy)
+
+    # Report each result as soon as it completes
+    collector = ResultCollector(total=len(universe.stocks))
+    def on_result(result):
+        collector.add(result)
+        display_result(result, collector)
+        if args.ledger_dir and result.ledger is not None:
+            np.save(os.path.join(args.ledger_dir, f'{result.symbol}.npy'), result.ledger)
+
+    universe.run_backtest(args.strategy, backend=args.backend, workers=args.workers,
+                          keep_ledger=args.ledger_dir is not None, callback=on_result, release=True)
+
+    display_summary(collector)
+    if args.report:
+        instruments.save(args.report)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# walk-forward.py
+
+import argparse
+import sys
+import os
+
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import WalkForward
+from greyhound.utils import read_config
+
+DATE_START = '2014-01-01'
+DATE_END   = '2021-06-30'
+
+def cli_args():
+    parser = argparse.ArgumentParser(description='Walk forward parameter optimization')
+    parser.add_argument('-f', dest='ticker_file', action='store', required=True)
+    parser.add_argument('-c', dest='config', action='store', required=True)
+    parser.add_argument('-s', dest='strategy', action='store', default='ema')
+    parser.add_argument('-p', dest='processes', action='store', type=int, default=None)
+    parser.add_argument('--train', dest='train', action='store', type=int, default=252,
+                        help='bars in each train slice')
+    parser.add_argument('--test', dest='test', action='store', type=int, default=63,
+                        help='bars in each test slice')
+    parser.add_argument('-o', dest='output', action='store', default=None,
+                        help='write the stitched out of sample curves to this csv')
+    return parser.parse_args()
+
+def read_ticker_file(ticker_file):
+    symbols = []
+    with open(ticker_file, 'r') as fh:
+        lines = fh.readlines()
+        for line in lines:
+            symbols.append(line.rstrip().lower())
+    return symbols
+
+if __name__ == '__main__':
+    args = cli_args()
+    config = read_config(args.config)
+    grid = config['sweep'][args.strategy]
+
+    walk = WalkForward(read_ticker_file(args.ticker_file), DATE_START, DATE_END, args.strategy,
+                       grid, train=args.train, test=args.test, config=config)
+    folds, equity = walk.run(args.processes)
+
+    if args.output:
+        equity.to_csv(args.output)
+    print(folds.to_string(index=False))
+    print(equity.iloc[-1].to_string())
@@ -3,3 +3,11 @@ from .stock import Stock as Stock
 from .strategy import StrategyFactory as StrategyFactory
 from .universe import Universe as Universe
 from .plotting import Plotter as Plotter
+from .sweep import ParameterSweep as ParameterSweep
+from .sharedmem import SharedOHLC as SharedOHLC
+from .results import BacktestResult as BacktestResult
+from .results import ResultCollector as ResultCollector
+from .panel import Panel as Panel
+from .walkforward import WalkForward as WalkForward
+from .montecarlo import MonteCarlo as MonteCarlo
+from .portfolio import PortfolioSimulation as PortfolioSimulation
@@ -3,11 +3,14 @@ import logging
 def get_logger(logger_name, log_level):
 
     logger = logging.getLogger(logger_name)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
 
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # Loggers are shared by name, only the first call gets a handler
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
+
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
 
     if log_level.lower() == 'info':
         logger.setLevel(logging.INFO)
@@ -0,0 +1,158 @@
+# benchmark.py
+""" Timing of the backtest stages on deterministic synthetic data. """
+import itertools
+import json
+import os
+import platform
+import time
+import numpy as np
+import pandas as pd
+from .simulation import Simulation
+from .strategy import StrategyFactory
+from .universe import Universe
+
+stages = ['load', 'strategy', 'simulation', 'aggregate']
+
+
+def synthetic_ohlc(n_bars, rng, start='2000-01-03'):
+    """ OHLC frame of a geometric random walk over n_bars business days. """
+    index = pd.bdate_range(start, periods=n_bars, name='date')
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_bars)))
+    open_ = close * np.exp(rng.normal(0, 0.005, n_bars))
+    spread = np.abs(rng.normal(0, 0.01, n_bars))
+    return pd.DataFrame({'open': open_,
+                         'high': np.maximum(open_, close) * (1 + spread),
+                         'low': np.minimum(open_, close) * (1 - spread),
+                         'close': close,
+                         'volume': rng.integers(100000, 10000000, n_bars).astype('float64')},
+                        index=index)
+
+
+def synthetic_symbols(n_symbols):
+    return [f'sym{i:04d}' for i in range(n_symbols)]
+
+
+def write_synthetic_store(path, n_symbols, n_bars, seed=0, format='table'):
+    """
+    Write an HDF5 store of n_symbols random walks of n_bars each, in the
+    layout Stock reads. The same seed always gives the same store. Return
+    the symbol list.
+    """
+    symbols = synthetic_symbols(n_symbols)
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_symbols)]
+    with pd.HDFStore(os.path.expanduser(path), mode='w') as store:
+        for symbol, rng in zip(symbols, rngs):
+            store.put(symbol, synthetic_ohlc(n_bars, rng), format=format)
+    return symbols
+
+
+def bench_config(hdf5_file):
+    """ Minimal config for benchmark runs, logging warnings only. """
+    return {'data_source': {'hdf5_file': str(hdf5_file)},
+            'data_map': {'column_name': 'close'},
+            'logging': {'log_level': 'warning'},
+            'strategy': {'max_position_risk': 10000,
+                         'buy_signal_boundary': 0.9,
+                         'sell_signal_boundary': -0.9}}
+
+
+def _timed(func, repeat):
+    """ Best wall time of repeat calls and the last result. """
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def time_stages(config, symbols, strategy='ema', engine='vector', repeat=3):
+    """ Best time in seconds of each stage over the symbols of the store. """
+    strat_factory = StrategyFactory()
+
+    def load():
+        return Universe(symbols, None, None, config=config, workers=1)
+
+    def create_strategies():
+        for stock in universe.stocks.values():
+            # time the computation, not the factor graph cache of the last repeat
+            stock.factors.clear()
+            strat_factory.create_strategy(stock, strategy)
+
+    def simulate():
+        for stock in universe.stocks.values():
+            stock.reset_trades()
+            Simulation(stock, engine).paper_trade(strategy)
+
+    def aggregate():
+        universe.get_basket_pnl()
+        return universe.get_performance_panel()
+
+    timings = {}
+    timings['load'], universe = _timed(load, repeat)
+    timings['strategy'], _ = _timed(create_strategies, repeat)
+    timings['simulation'], _ = _timed(simulate, repeat)
+    timings['aggregate'], _ = _timed(aggregate, repeat)
+    return timings
+
+
+def run_matrix(directory, bars=(1000, 5000), symbols=(10, 50), strategies=('ema',),
+               engine='vector', repeat=3, seed=0, callback=None):
+    """
+    Time every stage over each combination of history length, universe
+    size and strategy. Synthetic stores are written to directory, once per
+    size. Return dict with run metadata and a list of result rows.
+    """
+    rows = []
+    for n_bars, n_symbols in itertools.product(bars, symbols):
+        path = os.path.join(os.path.expanduser(directory), f'synthetic-{n_symbols}x{n_bars}-{seed}.h5')
+        symbol_list = write_synthetic_store(path, n_symbols, n_bars, seed)
+        config = bench_config(path)
+
+        for strategy in strategies:
+            timings = time_stages(config, symbol_list, strategy, engine, repeat)
+            for stage in stages:
+                row = {'stage': stage, 'bars': n_bars, 'symbols': n_symbols, 'strategy': strategy,
+                       'engine': engine, 'seconds': timings[stage],
+                       'us_per_bar': 1e6 * timings[stage] / (n_bars * n_symbols)}
+                rows.append(row)
+                if callback:
+                    callback(row)
+
+    meta = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'repeat': repeat,
+            'seed': seed}
+    return {'meta': meta, 'results': rows}
+
+
+def save_results(results, path):
+    with open(os.path.expanduser(path), 'w') as fh:
+        json.dump(results, fh, indent=2)
+
+
+def load_results(path):
+    with open(os.path.expanduser(path)) as fh:
+        return json.load(fh)
+
+
+def compare(baseline, current, threshold=0.2, min_seconds=0.005):
+    """
+    Match the rows of two benchmark runs and return DataFrame of the
+    time ratio current/baseline per row. A row is a regression when it is
+    more than threshold slower and by more than min_seconds, which keeps
+    timer noise on very short stages from being flagged.
+    """
+    keys = ['stage', 'bars', 'symbols', 'strategy', 'engine']
+    old = pd.DataFrame(baseline['results'])
+    new = pd.DataFrame(current['results'])
+    merged = old.merge(new, on=keys, suffixes=('_baseline', '_current'))
+
+    merged['ratio'] = merged['seconds_current'] / merged['seconds_baseline']
+    merged['regression'] = ((merged['ratio'] > 1 + threshold) &
+                            (merged['seconds_current'] - merged['seconds_baseline'] > min_seconds))
+    return merged[keys + ['seconds_baseline', 'seconds_current', 'ratio', 'regression']]
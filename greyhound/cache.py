@@ -0,0 +1,136 @@
+# cache.py
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(ohlc):
+    """ Hash of an OHLC frame's dates, columns and values. """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(ohlc.index.as_unit('ns').asi8.tobytes())
+    digest.update(json.dumps(list(ohlc.columns)).encode())
+    digest.update(np.ascontiguousarray(ohlc.to_numpy(dtype='float64')).tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    On-disk cache of strategy signal DataFrames. An entry is keyed by the
+    symbol, strategy, its parameters, the date range and a fingerprint of
+    the OHLC it was computed from, so it is reused only while none of them
+    change.
+
+    Each entry is a float64 .npy holding every column plus a small .json
+    of metadata. Entries are read memory-mapped. Once the directory holds
+    more than max_bytes, least recently read entries are removed.
+
+    Configured from the [cache] section:
+        directory = "~/tick_data/indicator_cache"
+        max_bytes = 1073741824
+    """
+    def __init__(self, directory, max_bytes=None):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    @classmethod
+    def from_config(cls, config):
+        """ Cache set up by the config, or None when caching is off. """
+        _config = config.get('cache', {})
+        if not _config.get('directory'):
+            return None
+        return cls(_config['directory'], _config.get('max_bytes') or None)
+
+
+    @staticmethod
+    def key(symbol, strategy, params, ohlc_fingerprint, date_start, date_end):
+        meta = json.dumps([symbol, strategy, params, str(date_start), str(date_end), ohlc_fingerprint],
+                          sort_keys=True, default=str)
+        return hashlib.blake2b(meta.encode(), digest_size=20).hexdigest()
+
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.npy', base + '.json'
+
+
+    def get(self, key, index):
+        """ Return cached DataFrame on index, or None on a miss. """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            # copy on write mapping: pages are read lazily and the frame
+            # can be modified without touching the file
+            data = np.load(data_path, mmap_mode='c')
+        except (OSError, ValueError):
+            return None
+
+        if data.shape[1] != len(index):
+            return None
+        os.utime(meta_path)
+        return pd.DataFrame(data.T, index=index, columns=meta['columns'], copy=False)
+
+
+    def put(self, key, frame, **meta):
+        """ Store frame under key and evict old entries if over budget. """
+        data_path, meta_path = self._paths(key)
+        meta['columns'] = list(frame.columns)
+
+        # Write to temporary names first so readers never see half an entry
+        tmp = f'{data_path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as fh:
+            np.save(fh, np.ascontiguousarray(frame.to_numpy(dtype='float64').T))
+        os.replace(tmp, data_path)
+
+        tmp = f'{meta_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(meta, fh, default=str)
+        os.replace(tmp, meta_path)
+
+        self._evict()
+
+
+    def entries(self):
+        """ List of (last read time, bytes, key) for every entry. """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json'):
+                continue
+            key = entry.name[:-5]
+            data_path, meta_path = self._paths(key)
+            try:
+                size = os.path.getsize(data_path) + entry.stat().st_size
+                entries.append((entry.stat().st_mtime, size, key))
+            except OSError:
+                continue
+        return entries
+
+
+    def size(self):
+        return sum(size for mtime, size, key in self.entries())
+
+
+    def _evict(self):
+        if not self.max_bytes:
+            return
+        entries = sorted(self.entries())
+        total = sum(size for mtime, size, key in entries)
+        for mtime, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+
+    def clear(self):
+        for mtime, size, key in self.entries():
+            for path in self._paths(key):
+                os.remove(path)
@@ -0,0 +1,166 @@
+# checkpoint.py
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from .cache import fingerprint
+from .simulation import Simulation
+from .stock import Stock
+from .streaming import create_streaming, replay_frame, streaming_strategies
+
+
+class CheckpointStore:
+    """
+    Directory of streamed backtest state, one file per symbol and strategy.
+    A checkpoint holds the stock's bars, its trade ledger and the streaming
+    strategy's indicator state, so a later run can pick up after the last
+    bar and push only the bars added to the store since. The result is the
+    same as streaming the whole history again.
+
+    A checkpoint is only resumed when everything that shapes its result
+    is unchanged: strategy parameters, date_start, the [strategy]
+    simulation settings, the price column, the data source and compact
+    mode, and a fingerprint of the bars it holds. The last checkpointed
+    bar is read again from the store with the new ones, and a revised bar
+    means recomputing from scratch. Revisions further back are only
+    caught with verify, which rereads the whole history.
+
+    Bars and ledger are saved in full, so a save costs O(history) disk
+    IO however few bars were added. The processing is O(new bars).
+
+    Configured from the [checkpoint] section:
+        directory = "~/tick_data/checkpoints"
+        verify = false
+    """
+    version = 2
+
+    def __init__(self, directory, verify=False):
+        self.directory = os.path.expanduser(directory)
+        self.verify    = verify
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    @classmethod
+    def from_config(cls, config):
+        """ Store set up by the config, or None when checkpoints are off. """
+        _config = config.get('checkpoint', {})
+        if not _config.get('directory'):
+            return None
+        return cls(_config['directory'], _config.get('verify', False))
+
+
+    @staticmethod
+    def settings(config, date_start=None):
+        """ Everything besides strategy parameters that a checkpoint's result depends on. """
+        _strategy = config['strategy']
+        return {'date_start': None if date_start is None else pd.Timestamp(date_start),
+                'column_name': config['data_map']['column_name'],
+                'max_position_risk': _strategy['max_position_risk'],
+                'buy_signal_boundary': _strategy['buy_signal_boundary'],
+                'sell_signal_boundary': _strategy['sell_signal_boundary'],
+                'data_source': dict(config['data_source']),
+                'compact': config.get('memory', {}).get('compact', False)}
+
+
+    def path(self, symbol, strategy_name):
+        return os.path.join(self.directory, f'{symbol.lower()}-{strategy_name}.pkl')
+
+
+    def save(self, stock, strategy, date_start=None):
+        """ Write the state of stock and its streaming strategy. """
+        state = {'version': self.version,
+                 'symbol': stock.symbol,
+                 'strategy': strategy.strategy_name,
+                 'settings': self.settings(stock.config, date_start),
+                 'fingerprint': fingerprint(stock.ohlc),
+                 'ohlc': stock.ohlc,
+                 'ledger': stock.ledger.state(),
+                 'stream': strategy.state()}
+
+        path = self.path(stock.symbol, strategy.strategy_name)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+    def load(self, symbol, strategy_name, config, date_start=None, params=None):
+        """
+        Rebuild (stock, strategy, simulation) from a checkpoint, with the
+        simulation trading new bars. None when there is no checkpoint or it
+        was made with other parameters, settings or bars.
+        """
+        try:
+            with open(self.path(symbol, strategy_name), 'rb') as fh:
+                state = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        strategy_cls = streaming_strategies[strategy_name]
+        if (state.get('version') != self.version or
+                state['stream']['params'] != strategy_cls.batch.read_params(config, params) or
+                state['settings'] != self.settings(config, date_start) or
+                state['fingerprint'] != fingerprint(state['ohlc'])):
+            return None
+
+        stock = Stock(symbol, None, None, config=config, ohlc=state['ohlc'])
+        stock.ledger.restore(state['ledger'])
+        strategy = strategy_cls.restore(stock, state['stream'])
+        simulation = Simulation(stock)
+        simulation.stream(strategy, warm_up=False)
+        return stock, strategy, simulation
+
+
+    def _new_bars(self, stock, date_end=None):
+        """
+        Bars of the store after the stock's last one, or None when the
+        store no longer has the bars the stock was built from.
+        """
+        last_date = stock.ledger.index[-1]
+        if self.verify:
+            start, stored = stock.ohlc.index[0], stock.ohlc
+        else:
+            start, stored = last_date, stock.ohlc.iloc[-1:]
+
+        # Table and npy stores push the date range down, so this reads the new bars only
+        bars = stock.source.load(stock.symbol, start, date_end, stock.columns)
+        bars = bars.loc[bars.index >= start]
+        if date_end is not None:
+            bars = bars.loc[:date_end]
+
+        old = bars.loc[bars.index <= last_date]
+        columns = [c for c in old.columns if c in stored.columns]
+        if (not old.index.equals(stored.index) or
+                not np.allclose(old[columns].to_numpy(dtype='float64'),
+                                stored[columns].to_numpy(dtype='float64'), rtol=1e-6, equal_nan=True)):
+            return None
+        return bars.loc[bars.index > last_date]
+
+
+    def update(self, symbol, strategy_name, config, date_start=None, date_end=None, params=None):
+        """
+        Bring symbol's checkpoint up to date_end and save it. Without a
+        usable checkpoint the history from date_start is streamed first.
+        Otherwise only bars after the checkpoint are processed. Return the
+        updated Stock.
+        """
+        loaded = self.load(symbol, strategy_name, config, date_start, params)
+        new_bars = None
+        if loaded is not None:
+            stock, strategy, simulation = loaded
+            new_bars = self._new_bars(stock, date_end)
+            if new_bars is None:
+                stock.logger.warning(f'{symbol.upper()}: store data changed since the checkpoint, recomputing')
+
+        if new_bars is None:
+            stock = Stock(symbol, date_start, date_end, config=config)
+            strategy = create_streaming(stock, strategy_name, params)
+            Simulation(stock).stream(strategy)
+        else:
+            last_date = stock.ledger.index[-1]
+            for trade_date, bar in replay_frame(new_bars):
+                stock.push_bar(trade_date, **bar)
+            stock.logger.info(f'{stock.symbol.upper()}: pushed {len(new_bars)} new bars after {last_date}')
+
+        self.save(stock, strategy, date_start)
+        return stock
@@ -0,0 +1,206 @@
+# datasource.py
+""" Read OHLC from the tick store. """
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+def load_columns(config):
+    """
+    Columns to read, from [data_map] columns in the config. None reads
+    every column. The price column and close are always included.
+    """
+    columns = config['data_map'].get('columns')
+    if not columns:
+        return None
+    needed = [config['data_map']['column_name'], 'close']
+    return list(columns) + [c for c in dict.fromkeys(needed) if c not in columns]
+
+
+def _end_time(date_end):
+    # '2015-12' should include all of December, as .loc slicing does
+    if isinstance(date_end, str):
+        return pd.Period(date_end).end_time
+    return pd.Timestamp(date_end)
+
+
+def read_ohlc(store, symbol, date_start=None, date_end=None, columns=None):
+    """
+    Read symbol from an open HDFStore. For table format stores the date
+    range and columns are pushed down into the HDF5 query, so only the
+    needed rows are read. Fixed format stores can only be read whole.
+
+    One bar before date_start is kept so returns on the first date of the
+    range match those computed on the full history.
+    """
+    key = f'/{symbol.lower()}'
+    storer = store.get_storer(key)
+    if storer is None:
+        raise KeyError(f'{symbol} not in {store.filename}')
+
+    if not storer.is_table:
+        ohlc = store.select(key)
+        return ohlc[columns] if columns else ohlc
+
+    where = []
+    if date_start is not None:
+        where.append(f"index>='{pd.Timestamp(date_start)}'")
+    if date_end is not None:
+        where.append(f"index<='{_end_time(date_end)}'")
+    if not where:
+        return store.select(key, columns=columns)
+
+    coords = store.select_as_coordinates(key, where=where)
+    if len(coords) == 0:
+        return store.select(key, start=0, stop=0, columns=columns)
+    return store.select(key, start=max(coords[0] - 1, 0), stop=coords[-1] + 1, columns=columns)
+
+
+def count_bars(path, symbols):
+    """
+    Bar count of each symbol from store metadata, without reading any
+    rows. Return dict of symbol:rows.
+    """
+    counts = {}
+    with pd.HDFStore(os.path.expanduser(path), mode='r') as store:
+        for symbol in symbols:
+            storer = store.get_storer(f'/{symbol.lower()}')
+            counts[symbol] = int(storer.nrows if storer.is_table else storer.shape[0])
+    return counts
+
+
+def load_ohlc(path, symbol, date_start=None, date_end=None, columns=None):
+    """ Open the store, read one symbol and close it again. """
+    with pd.HDFStore(os.path.expanduser(path), mode='r') as store:
+        return read_ohlc(store, symbol, date_start, date_end, columns)
+
+
+def load_many(path, symbols, date_start=None, date_end=None, columns=None,
+              post=None, workers=None):
+    """
+    Load many symbols through a single open store. Reads share the handle
+    and are serialized, as PyTables handles are not thread safe, while
+    post(symbol, ohlc) processing of already read symbols runs concurrently
+    on a thread pool. Return dict of symbol:result of post (or the frame).
+    """
+    lock = threading.Lock()
+
+    with pd.HDFStore(os.path.expanduser(path), mode='r') as store:
+        def load(symbol):
+            with lock:
+                ohlc = read_ohlc(store, symbol, date_start, date_end, columns)
+            return post(symbol, ohlc) if post else ohlc
+
+        with ThreadPoolExecutor(workers or min(8, os.cpu_count())) as pool:
+            return dict(zip(symbols, pool.map(load, symbols)))
+
+
+class HDF5Source:
+    """
+    The HDF5 tick store, one /<symbol> key per symbol.
+
+        [data_source]
+        backend = "hdf5"
+        hdf5_file = "~/tick_data/ohlc.h5"
+    """
+    def __init__(self, config):
+        self.path = config['hdf5_file']
+
+    def load(self, symbol, date_start=None, date_end=None, columns=None):
+        return load_ohlc(self.path, symbol, date_start, date_end, columns)
+
+    def count_bars(self, symbols):
+        return count_bars(self.path, symbols)
+
+    def load_many(self, symbols, date_start=None, date_end=None, columns=None,
+                  post=None, workers=None):
+        return load_many(self.path, symbols, date_start, date_end, columns, post, workers)
+
+
+class NpySource:
+    """
+    Columnar store of raw .npy files, one directory per symbol holding
+    index.npy (int64 nanoseconds), a float64 <column>.npy per column and
+    meta.json. Files are memory mapped and only the requested columns are
+    opened, so a load costs the page faults of the rows it touches rather
+    than decompressing and parsing whole tables. Frames are views on the
+    read only maps.
+
+        [data_source]
+        backend = "npy"
+        npy_dir = "~/tick_data/ohlc_npy"
+    """
+    def __init__(self, config):
+        self.directory = os.path.expanduser(config['npy_dir'])
+
+    def _dir(self, symbol):
+        return os.path.join(self.directory, symbol.lower())
+
+    def _meta(self, symbol):
+        try:
+            with open(os.path.join(self._dir(symbol), 'meta.json')) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            raise KeyError(f'{symbol} not in {self.directory}')
+
+    def load(self, symbol, date_start=None, date_end=None, columns=None):
+        """ Same rows as read_ohlc on a table store, one lookback bar included. """
+        meta = self._meta(symbol)
+        index = np.load(os.path.join(self._dir(symbol), 'index.npy'), mmap_mode='r')
+
+        start, stop = 0, len(index)
+        if date_start is not None:
+            start = int(np.searchsorted(index, pd.Timestamp(date_start).as_unit('ns').value))
+        if date_end is not None:
+            stop = int(np.searchsorted(index, _end_time(date_end).as_unit('ns').value, side='right'))
+        # No bars in range reads nothing, as the table query does, else add the lookback bar
+        start = stop if start >= stop else max(start - 1, 0)
+
+        columns = columns or meta['columns']
+        data = {c: np.load(os.path.join(self._dir(symbol), f'{c}.npy'), mmap_mode='r')[start:stop]
+                for c in columns}
+        dates = pd.DatetimeIndex(index[start:stop].view('datetime64[ns]'), name=meta['index_name'])
+        return pd.DataFrame(data, index=dates, copy=False)
+
+    def count_bars(self, symbols):
+        return {symbol: self._meta(symbol)['rows'] for symbol in symbols}
+
+    def load_many(self, symbols, date_start=None, date_end=None, columns=None,
+                  post=None, workers=None):
+        def load(symbol):
+            ohlc = self.load(symbol, date_start, date_end, columns)
+            return post(symbol, ohlc) if post else ohlc
+
+        with ThreadPoolExecutor(workers or min(8, os.cpu_count())) as pool:
+            return dict(zip(symbols, pool.map(load, symbols)))
+
+    def write(self, symbol, ohlc):
+        """ Store an OHLC frame for symbol, replacing what was there. """
+        path = self._dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'index.npy'), ohlc.index.as_unit('ns').asi8)
+        for c in ohlc.columns:
+            np.save(os.path.join(path, f'{c}.npy'), ohlc[c].to_numpy(dtype='float64'))
+
+        # meta.json goes last: a symbol without it is not in the store yet
+        meta = {'columns': list(ohlc.columns), 'index_name': ohlc.index.name, 'rows': len(ohlc)}
+        with open(os.path.join(path, 'meta.json'), 'w') as fh:
+            json.dump(meta, fh)
+
+
+sources = {
+            'hdf5': HDF5Source,
+            'npy': NpySource,
+        }
+
+def open_source(config):
+    """ Data source backend named by [data_source] backend, HDF5 by default. """
+    _config = config['data_source']
+    try:
+        func = sources[_config.get('backend', 'hdf5')]
+    except KeyError:
+        raise AssertionError("Data source undefined")
+    return func(_config)
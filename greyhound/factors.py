@@ -0,0 +1,101 @@
+# factors.py
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import pandas as pd
+
+
+class Factor(ABC):
+    """
+    Node of a factor graph. A factor is declared with its input factors and
+    parameters, and its key is built from both. Two factors declared the
+    same way have the same key, however and wherever they were created, so
+    a FactorGraph computes them only once.
+    """
+    def __init__(self, *inputs, **params):
+        self.inputs = inputs
+        self.params = params
+        self.key = (type(self).__name__, tuple(sorted(params.items())),
+                    tuple(f.key for f in inputs))
+
+    @abstractmethod
+    def compute(self, ohlc, *values):
+        pass
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.params})'
+
+
+class Column(Factor):
+    """ Column of the stock OHLC, e.g. Column(name='close') """
+    def compute(self, ohlc):
+        return ohlc[self.params['name']]
+
+
+class EWM(Factor):
+    """ Exponential mean of the input over span periods """
+    def compute(self, ohlc, series):
+        return series.ewm(span=self.params['span']).mean()
+
+
+class Sub(Factor):
+    """ First input minus second input """
+    def compute(self, ohlc, left, right):
+        return left - right
+
+
+class MinMaxNorm(Factor):
+    """ Input scaled to 0..1 by its minimum and maximum """
+    def compute(self, ohlc, series):
+        return (series - series.min()) / (series.max() - series.min())
+
+
+class FactorGraph:
+    """
+    Evaluate factors on one stock's OHLC. Every evaluated node, including
+    intermediate ones, is cached by key with least recently used eviction
+    once maxsize nodes are held. The cache is dropped if the stock's OHLC
+    frame is replaced.
+    """
+    def __init__(self, stock, maxsize=64):
+        self.stock   = stock
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._cache  = OrderedDict()
+        self._ohlc   = stock.ohlc
+
+    def evaluate(self, factor):
+        """ Return the Series of factor, computing missing nodes once. """
+        if self.stock.ohlc is not self._ohlc:
+            self.clear()
+
+        if factor.key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(factor.key)
+            return self._cache[factor.key]
+
+        self.misses += 1
+        values = [self.evaluate(f) for f in factor.inputs]
+        result = factor.compute(self.stock.ohlc, *values)
+
+        self._cache[factor.key] = result
+        while self.maxsize and len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def frame(self, factors):
+        """ DataFrame of a dict of column name -> factor. """
+        return pd.DataFrame({k: self.evaluate(f) for k, f in factors.items()},
+                            index=self.stock.ohlc.index)
+
+    def clear(self):
+        self._cache.clear()
+        self._ohlc = self.stock.ohlc
+
+    @property
+    def nbytes(self):
+        """ Bytes held by the values of the cached nodes. """
+        return sum(int(v.memory_usage(index=False)) for v in self._cache.values())
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,107 @@
+# ingest.py
+""" Build or refresh the HDF5 tick store from per symbol CSV files. """
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+ohlc_columns = ['open', 'high', 'low', 'close', 'volume']
+
+
+def read_csv_bars(path, columns=ohlc_columns):
+    """
+    Read one symbol's CSV, named <symbol>.csv, with a date column (named
+    date, or else the first column) and the given price columns. Bars with
+    a bad date, a missing or non-positive price, high below low or negative
+    volume are dropped, and of bars sharing a date the last one is kept.
+    Return (symbol, frame sorted by date, dict of row counts).
+    """
+    symbol = os.path.splitext(os.path.basename(path))[0].lower()
+    df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+
+    date_col = 'date' if 'date' in df.columns else df.columns[0]
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f'{path}: missing columns {missing}')
+
+    dates = pd.to_datetime(df[date_col], errors='coerce')
+    ohlc = df[columns].apply(pd.to_numeric, errors='coerce').astype('float64')
+    ohlc.index = pd.DatetimeIndex(dates, name='date')
+
+    prices = [c for c in ['open', 'high', 'low', 'close'] if c in columns]
+    bad = ohlc.index.isna() | ohlc['close'].isna().to_numpy()
+    bad |= (ohlc[prices] <= 0).any(axis=1).to_numpy()
+    if 'high' in columns and 'low' in columns:
+        bad |= (ohlc['high'] < ohlc['low']).to_numpy()
+    if 'volume' in columns:
+        bad |= (ohlc['volume'] < 0).to_numpy()
+
+    counts = {'rows': len(ohlc), 'invalid': int(bad.sum())}
+    ohlc = ohlc[~bad].sort_index(kind='stable')
+    duplicated = ohlc.index.duplicated(keep='last')
+    counts['duplicates'] = int(duplicated.sum())
+    return symbol, ohlc[~duplicated], counts
+
+
+def write_symbol(store, symbol, ohlc, replace=False, chunksize=100000, **filters):
+    """
+    Write bars to /<symbol> of an open HDFStore in table format, chunksize
+    rows per append, then index the dates. Unless replace is set bars are
+    added to what the store has: only dates after its last bar are
+    appended (a fixed format key is merged and rewritten as a table).
+    filters are complib and complevel. Return the number of rows written.
+    """
+    key = f'/{symbol.lower()}'
+    if key in store:
+        storer = store.get_storer(key)
+        if replace:
+            store.remove(key)
+        elif not storer.is_table:
+            ohlc = pd.concat([store.select(key), ohlc])
+            ohlc = ohlc[~ohlc.index.duplicated(keep='last')].sort_index(kind='stable')
+            store.remove(key)
+        elif storer.nrows:
+            last = store.select_column(key, 'index', start=storer.nrows - 1).iloc[0]
+            ohlc = ohlc.loc[ohlc.index > last]
+
+    for start in range(0, len(ohlc), chunksize):
+        store.append(key, ohlc.iloc[start:start + chunksize], format='table', index=False, **filters)
+    if len(ohlc):
+        store.create_table_index(key, columns=['index'], optlevel=9, kind='full')
+    return len(ohlc)
+
+
+def ingest(csv_dir, store_path, workers=None, replace=False, columns=ohlc_columns,
+           chunksize=100000, complib='blosc:zstd', complevel=5, callback=None):
+    """
+    Load every <symbol>.csv of csv_dir into the store. CSV files are parsed
+    and validated in parallel on a process pool, while this process writes
+    each symbol as soon as it is ready (HDF5 files take one writer).
+    callback, if given, is called with each symbol's row. Return DataFrame
+    by symbol of rows read, dropped and written, and any error.
+    """
+    paths = sorted(glob.glob(os.path.join(os.path.expanduser(csv_dir), '*.csv')))
+    filters = {'complib': complib, 'complevel': complevel}
+
+    rows = []
+    # Workers only parse, and are started before the store is opened so a
+    # forked worker never inherits an HDF5 handle.
+    with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+        futures = {pool.submit(read_csv_bars, path, columns): path for path in paths}
+        with pd.HDFStore(os.path.expanduser(store_path), mode='a') as store:
+            for future in as_completed(futures):
+                symbol = os.path.splitext(os.path.basename(futures[future]))[0].lower()
+                try:
+                    symbol, ohlc, counts = future.result()
+                    counts['written'] = write_symbol(store, symbol, ohlc, replace, chunksize, **filters)
+                    counts['error'] = None
+                except Exception as e:
+                    counts = {'error': repr(e)}
+                row = {'symbol': symbol, **counts}
+                rows.append(row)
+                if callback:
+                    callback(row)
+
+    columns = ['symbol', 'rows', 'invalid', 'duplicates', 'written', 'error']
+    return pd.DataFrame(rows, columns=columns).sort_values('symbol', ignore_index=True)
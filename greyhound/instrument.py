@@ -0,0 +1,194 @@
+# instrument.py
+""" Stage timers, counters and an opt in profiler for backtest runs. """
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+_null = contextlib.nullcontext()
+
+
+def _stat():
+    return [0, 0.0, 0.0]        # calls, total seconds, max seconds
+
+
+class Instruments:
+    """
+    Wall time and call count of named stages, plus counters, each kept per
+    symbol. Off by default: a disabled timer is a shared no-op context, so
+    instrumented code pays one attribute check per stage.
+
+    Workers of a process pool collect into their own copy and send a
+    snapshot back with their results; merge() adds it to the parent's
+    totals and keeps a per worker breakdown.
+
+    configure() is called by the entry points only, the app scripts,
+    BacktestRunner.run and pool workers, so helper Stocks and Universes
+    built with another config leave the state of a run alone.
+
+    Configured from the [instrument] section:
+        enabled = true
+        profile = true                  # cProfile each run / worker chunk
+        profile_dir = "/tmp/greyhound-profile"
+    """
+    def __init__(self):
+        self.enabled     = False
+        self.profile_dir = None
+        self._lock       = threading.Lock()
+        self.clear()
+
+
+    def configure(self, config):
+        """ Turn instrumentation and profiling on or off as the config says. """
+        _config = config.get('instrument', {})
+        self.enabled = bool(_config.get('enabled', False))
+        if _config.get('profile'):
+            self.profile_dir = os.path.expanduser(_config.get('profile_dir') or '.')
+        else:
+            self.profile_dir = None
+
+
+    def clear(self):
+        with self._lock:
+            self.stats    = defaultdict(_stat)          # (stage, symbol) -> stat
+            self.counters = defaultdict(int)            # (name, symbol) -> value
+            self.workers  = defaultdict(lambda: defaultdict(_stat))
+
+
+    def timer(self, stage, symbol=None):
+        """ Context manager timing stage for symbol. """
+        if not self.enabled:
+            return _null
+        return self._timer(stage, symbol)
+
+
+    @contextlib.contextmanager
+    def _timer(self, stage, symbol):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stat = self.stats[(stage, symbol)]
+                stat[0] += 1
+                stat[1] += elapsed
+                stat[2] = max(stat[2], elapsed)
+
+
+    def count(self, name, value=1, symbol=None):
+        if self.enabled:
+            with self._lock:
+                self.counters[(name, symbol)] += value
+
+
+    def profile(self, name):
+        """
+        Context manager running the block under cProfile when profiling is
+        configured, writing <name>-<pid>.prof to profile_dir.
+        """
+        if not self.profile_dir:
+            return _null
+        return self._profile(name)
+
+
+    @contextlib.contextmanager
+    def _profile(self, name):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, f'{name}-{os.getpid()}.prof'))
+
+
+    def snapshot(self):
+        """ Picklable copy of the stats and counters of this process, which are then cleared. """
+        with self._lock:
+            snapshot = {'pid': os.getpid(),
+                        'stats': {k: list(v) for k,v in self.stats.items()},
+                        'counters': dict(self.counters)}
+        self.clear()
+        return snapshot
+
+
+    def merge(self, snapshot):
+        """ Add a worker's snapshot to the totals here. """
+        with self._lock:
+            worker = self.workers[snapshot['pid']]
+            for key, (calls, total, longest) in snapshot['stats'].items():
+                for stat in (self.stats[key], worker[key[0]]):
+                    stat[0] += calls
+                    stat[1] += total
+                    stat[2] = max(stat[2], longest)
+            for key, value in snapshot['counters'].items():
+                self.counters[key] += value
+
+
+    def report(self):
+        """
+        Dict of stage totals, per symbol stages, per worker stages and
+        counters, ready for JSON.
+        """
+        def entry(stat):
+            return {'calls': stat[0], 'seconds': stat[1], 'max_seconds': stat[2]}
+
+        stages, symbols, counters = defaultdict(_stat), defaultdict(dict), defaultdict(int)
+        with self._lock:
+            for (stage, symbol), stat in self.stats.items():
+                total = stages[stage]
+                total[0] += stat[0]
+                total[1] += stat[1]
+                total[2] = max(total[2], stat[2])
+                if symbol is not None:
+                    symbols[symbol][stage] = entry(stat)
+            for (name, symbol), value in self.counters.items():
+                counters[name] += value
+            workers = {str(pid): {stage: entry(stat) for stage, stat in v.items()}
+                       for pid, v in self.workers.items()}
+
+        return {'stages': {k: entry(v) for k,v in stages.items()},
+                'symbols': dict(symbols),
+                'workers': workers,
+                'counters': dict(counters)}
+
+
+    def prometheus(self):
+        """ Stats and counters in the Prometheus text exposition format. """
+        def labels(**kwargs):
+            return ','.join(f'{k}="{v}"' for k,v in kwargs.items() if v is not None)
+
+        lines = ['# TYPE greyhound_stage_seconds_total counter']
+        with self._lock:
+            stats = sorted(self.stats.items(), key=str)
+            for (stage, symbol), (calls, total, longest) in stats:
+                lines.append(f'greyhound_stage_seconds_total{{{labels(stage=stage, symbol=symbol)}}} {total}')
+            lines.append('# TYPE greyhound_stage_calls_total counter')
+            for (stage, symbol), (calls, total, longest) in stats:
+                lines.append(f'greyhound_stage_calls_total{{{labels(stage=stage, symbol=symbol)}}} {calls}')
+            lines.append('# TYPE greyhound_worker_stage_seconds_total counter')
+            for pid, v in self.workers.items():
+                for stage, (calls, total, longest) in v.items():
+                    lines.append(f'greyhound_worker_stage_seconds_total{{{labels(worker=pid, stage=stage)}}} {total}')
+            lines.append('# TYPE greyhound_events_total counter')
+            for (name, symbol), value in sorted(self.counters.items(), key=str):
+                lines.append(f'greyhound_events_total{{{labels(name=name, symbol=symbol)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+    def save(self, path):
+        """ Write report to path, Prometheus text if it ends in .prom else JSON. """
+        with open(os.path.expanduser(path), 'w') as fh:
+            if path.endswith('.prom'):
+                fh.write(self.prometheus())
+            else:
+                json.dump(self.report(), fh, indent=2)
+
+
+# Instruments of this process
+instruments = Instruments()
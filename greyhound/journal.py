@@ -0,0 +1,139 @@
+# journal.py
+""" Append only binary journal of simulation trade and risk check events. """
+import glob
+import os
+import threading
+from multiprocessing.util import Finalize
+import numpy as np
+import pandas as pd
+
+MAGIC = b'GHJRNL01'
+
+# Fixed record schema, written column by column per batch
+schema = np.dtype([('date', 'i8'),          # ns since the epoch
+                   ('symbol', 'S16'),
+                   ('event', 'i1'),
+                   ('shares', 'f8'),        # size decided by a risk check, signed size of a trade
+                   ('price', 'f8'),         # trade price, NaN for risk checks
+                   ('risk', 'f8')])         # risk allowed, NaN for trades
+
+events = ['risk_check', 'trade']
+RISK_CHECK, TRADE = 0, 1
+
+_journals = {}
+
+
+class TradeJournal:
+    """
+    Journal of fixed schema event records, buffered in memory and written
+    batch_size records at a time. A batch is a record count followed by one
+    contiguous array per schema column, so recording an event costs a row
+    assignment and no text formatting; read_journal() turns the file back
+    into a DataFrame.
+
+    Each process appends to its own journal-<pid>.ghj file of the
+    directory, and flushes what is buffered when it exits.
+
+    Configured from the [journal] section:
+        directory = "~/tick_data/journal"
+        batch_size = 4096
+    """
+    def __init__(self, directory, batch_size=4096):
+        self.directory  = os.path.expanduser(directory)
+        self.batch_size = batch_size
+        self.path       = os.path.join(self.directory, f'journal-{os.getpid()}.ghj')
+        self.buffer     = np.zeros(batch_size, dtype=schema)
+        self.size       = 0
+        self._lock      = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as fh:
+                fh.write(MAGIC)
+        Finalize(None, self.flush, exitpriority=10)
+
+
+    def record(self, event, trade_date, symbol, shares, price=np.nan, risk=np.nan):
+        with self._lock:
+            self.buffer[self.size] = (trade_date.value, symbol, event, shares, price, risk)
+            self.size += 1
+            if self.size == self.batch_size:
+                self._write(self.buffer)
+
+
+    def record_many(self, event, dates, symbol, shares, price=np.nan, risk=np.nan):
+        """ Record one event per date of the DatetimeIndex dates. """
+        records = np.zeros(len(dates), dtype=schema)
+        records['date'] = dates.as_unit('ns').asi8
+        records['symbol'] = symbol
+        records['event'] = event
+        records['shares'] = shares
+        records['price'] = price
+        records['risk'] = risk
+        with self._lock:
+            self._write(self.buffer[:self.size])
+            self._write(records)
+
+
+    def flush(self):
+        with self._lock:
+            self._write(self.buffer[:self.size])
+
+
+    def _write(self, records):
+        if len(records):
+            with open(self.path, 'ab') as fh:
+                fh.write(np.uint32(len(records)).tobytes())
+                for name in schema.names:
+                    fh.write(np.ascontiguousarray(records[name]).tobytes())
+        self.size = 0
+
+
+def open_journal(config):
+    """ This process' journal for the config, or None when journaling is off. """
+    _config = config.get('journal', {})
+    if not _config.get('directory'):
+        return None
+    key = (os.path.expanduser(_config['directory']), os.getpid())
+    if key not in _journals:
+        _journals[key] = TradeJournal(_config['directory'], _config.get('batch_size', 4096))
+    return _journals[key]
+
+
+def _read_file(path):
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f'{path}: not a trade journal')
+
+    batches, offset = [], len(MAGIC)
+    while offset + 4 <= len(data):
+        n = int(np.frombuffer(data, 'u4', 1, offset)[0])
+        end = offset + 4 + n * schema.itemsize
+        if end > len(data):
+            break                   # batch cut short by a crash
+        batch, offset = np.zeros(n, dtype=schema), offset + 4
+        for name in schema.names:
+            dtype = schema.fields[name][0]
+            batch[name] = np.frombuffer(data, dtype, n, offset)
+            offset += n * dtype.itemsize
+        batches.append(batch)
+    return np.concatenate(batches) if batches else np.zeros(0, dtype=schema)
+
+
+def read_journal(path):
+    """
+    DataFrame of the events of a journal file, or of every journal file of
+    a directory, ordered by date.
+    """
+    path = os.path.expanduser(path)
+    paths = sorted(glob.glob(os.path.join(path, '*.ghj'))) if os.path.isdir(path) else [path]
+    records = np.concatenate([_read_file(p) for p in paths]) if paths else np.zeros(0, dtype=schema)
+
+    df = pd.DataFrame({'date': pd.to_datetime(records['date'], unit='ns'),
+                       'symbol': np.char.decode(records['symbol']).astype('object'),
+                       'event': pd.Categorical.from_codes(records['event'], events),
+                       'shares': records['shares'],
+                       'price': records['price'],
+                       'risk': records['risk']})
+    return df.sort_values('date', kind='stable', ignore_index=True)
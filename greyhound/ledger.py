@@ -0,0 +1,266 @@
+# ledger.py
+import numpy as np
+import pandas as pd
+
+
+# Record layout of a packed ledger, one record per non-zero trade
+packed_dtype = np.dtype([('date', 'int64'), ('shares', 'float64'),
+                         ('trade_price', 'float64'), ('trade_cost', 'float64')])
+
+
+class TradeLedger:
+    """
+    Trade ledger preallocated to the OHLC index of a Stock. Every date has
+    a slot in a set of contiguous arrays, so logging a trade never grows or
+    copies a DataFrame.
+
+    The running columns (shares held, cash position, share value and book
+    value) are kept current up to the last logged trade. Dates after it
+    inherit the last running value, which makes point lookups O(1).
+
+    New dates can be appended for streamed bars. The arrays then grow by
+    doubling, so they may be longer than the number of dates (size).
+
+    With compact the ledger reads the dates from the index and the mark
+    price from the array passed in, a column of the stock's OHLC, instead
+    of copying them, and keeps the trade and value columns as float32.
+    Shares held and cash stay float64, so PnL is summed at full precision.
+    """
+    columns = ['shares', 'trade_price', 'trade_cost', 'cash_position', 'share_value', 'book_value']
+    arrays = columns + ['held_shares', 'mark_price', 'logged', '_dates']
+
+    def __init__(self, index, mark_price, compact=False):
+        self._index      = index
+        self._index_name = index.name
+        self._unit       = index.unit
+        self.compact     = compact
+        self.size        = len(index)
+        if compact:
+            self._dates     = index.asi8                            # views, not owned
+            self.mark_price = np.asarray(mark_price)
+            self._views     = {'_dates', 'mark_price'}
+        else:
+            self._dates     = index.asi8.copy()
+            self.mark_price = np.array(mark_price, dtype='float64')    # price used to value held shares
+            self._views     = set()
+
+        size = len(index)
+        dtype = 'float32' if compact else 'float64'
+        self.shares        = np.zeros(size, dtype)  # shares traded at date
+        self.trade_price   = np.zeros(size, dtype)  # price of shares at trade date
+        self.trade_cost    = np.zeros(size, dtype)  # total cost of trade
+        self.held_shares   = np.zeros(size)         # running shares held
+        self.cash_position = np.zeros(size)         # running cash held at date
+        self.share_value   = np.zeros(size, dtype)  # value of held shares at date
+        self.book_value    = np.zeros(size, dtype)  # cash + share value at date
+        self.logged        = np.zeros(size, dtype='bool')
+
+        # The first date is always present in the trade log view, as it was
+        # when the log was a DataFrame seeded with a single empty row.
+        self.logged[0] = True
+        self._last = 0
+
+
+    def __len__(self):
+        return self.size
+
+
+    @property
+    def dates(self):
+        """ Dates as int64 in the unit of the index, sorted, one per slot. """
+        return self._dates[:self.size]
+
+
+    @property
+    def unit(self):
+        return self._unit
+
+
+    @property
+    def nbytes(self):
+        """ Bytes of the arrays the ledger owns, not of those it reads from the stock. """
+        return sum(getattr(self, name).nbytes for name in self.arrays if name not in self._views)
+
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.DatetimeIndex(self._dates[:self.size].view(f'datetime64[{self._unit}]'),
+                                           name=self._index_name)
+        return self._index
+
+
+    def append(self, trade_date, mark_price):
+        """
+        Add a slot for a date after the last one and return its position.
+        Amortized O(1).
+        """
+        trade_date = pd.Timestamp(trade_date)
+        value = trade_date.as_unit(self._unit, round_ok=False).asm8.view('int64')
+        if self.size and value <= self._dates[self.size - 1]:
+            raise Exception(f'{trade_date} is not after the last date')
+
+        if self.size == len(self.shares):
+            self._grow(max(16, 2 * self.size))
+
+        pos = self.size
+        self._dates[pos] = value
+        self.mark_price[pos] = mark_price
+        self.size += 1
+
+        self._index = None
+        return pos
+
+
+    def _grow(self, capacity):
+        for name in self.arrays:
+            arr = getattr(self, name)
+            grown = np.zeros(capacity, dtype=arr.dtype)
+            grown[:len(arr)] = arr
+            setattr(self, name, grown)
+        self._views = set()
+
+
+    def reset(self):
+        """ Clear all trades, keeping the allocated arrays. """
+        for arr in (self.shares, self.trade_price, self.trade_cost, self.held_shares,
+                    self.cash_position, self.share_value, self.book_value):
+            arr.fill(0)
+        self.logged.fill(False)
+        self.logged[0] = True
+        self._last = 0
+
+
+    def log(self, pos, shares, price):
+        """
+        Record a trade at integer position pos. A second trade on the same
+        date replaces the first, as .loc assignment did on the DataFrame.
+        """
+        cost = (shares * price) * -1
+        self.shares[pos]      = shares
+        self.trade_price[pos] = price
+        self.trade_cost[pos]  = cost
+        self.logged[pos]      = True
+
+        if pos > self._last:
+            # Trades normally arrive in date order: carry the running columns
+            # forward to pos and add the new trade on top.
+            last = self._last
+            self.held_shares[last+1:pos]   = self.held_shares[last]
+            self.cash_position[last+1:pos] = self.cash_position[last]
+            self.held_shares[pos]   = self.held_shares[last] + shares
+            self.cash_position[pos] = self.cash_position[last] + cost
+            self._last = pos
+            self._mark(last + 1, pos + 1)
+        else:
+            self._recalc(pos)
+
+
+    def log_many(self, positions, shares, prices):
+        """ Record many trades at once and rebuild the running columns in one pass. """
+        positions = np.asarray(positions, dtype='int64')
+        if len(positions) == 0:
+            return
+
+        shares = np.asarray(shares, dtype='float64')
+        prices = np.asarray(prices, dtype='float64')
+        self.shares[positions]      = shares
+        self.trade_price[positions] = prices
+        self.trade_cost[positions]  = (shares * prices) * -1
+        self.logged[positions]      = True
+
+        self._last = max(self._last, int(positions.max()))
+        self._recalc(int(positions.min()))
+
+
+    def _recalc(self, start):
+        """ Rebuild the running columns from position start to the last trade. """
+        stop = self._last + 1
+        held = self.held_shares[start-1] if start else 0.0
+        cash = self.cash_position[start-1] if start else 0.0
+
+        # summed in float64 from shares and price, which compact ledgers keep as float32
+        shares = self.shares[start:stop].astype('float64')
+        cost = (shares * self.trade_price[start:stop]) * -1
+        self.held_shares[start:stop]   = held + np.cumsum(shares)
+        self.cash_position[start:stop] = cash + np.cumsum(cost)
+        self._mark(start, stop)
+
+
+    def _mark(self, start, stop):
+        value = self.held_shares[start:stop] * self.mark_price[start:stop]
+        self.share_value[start:stop] = value
+        self.book_value[start:stop]  = self.cash_position[start:stop] + value
+
+
+    def held_at(self, pos):
+        """ Shares held at integer position pos, or at each of an array of positions. """
+        return self.held_shares[np.minimum(pos, self._last)]
+
+
+    def cash_at(self, pos):
+        """ Cash position at integer position pos, or at each of an array of positions. """
+        return self.cash_position[np.minimum(pos, self._last)]
+
+
+    def min_cash_at(self, pos):
+        """ Lowest cash position between the first date and pos, or each of an array of positions. """
+        if np.ndim(pos):
+            running_min = np.minimum.accumulate(self.cash_position[:self._last + 1])
+            return running_min[np.minimum(pos, self._last)]
+        return self.cash_position[:min(pos, self._last) + 1].min()
+
+
+    def running(self):
+        """
+        Shares held and cash position at every date. Dates after the last
+        trade carry the last running value.
+        """
+        held = self.held_shares[:self.size].copy()
+        cash = self.cash_position[:self.size].copy()
+        held[self._last+1:] = held[self._last]
+        cash[self._last+1:] = cash[self._last]
+        return held, cash
+
+
+    def trade_count(self):
+        """ Number of non-zero trades in the ledger. """
+        return int(np.count_nonzero(self.shares[:self.size]))
+
+
+    def packed(self):
+        """ Non-zero trades as a compact structured array. """
+        traded = self.shares[:self.size] != 0
+        packed = np.empty(int(traded.sum()), dtype=packed_dtype)
+        packed['date']        = self.index[traded].as_unit('ns').asi8
+        packed['shares']      = self.shares[:self.size][traded]
+        packed['trade_price'] = self.trade_price[:self.size][traded]
+        packed['trade_cost']  = self.trade_cost[:self.size][traded]
+        return packed
+
+
+    def unpack(self, packed):
+        """ Log the trades of a packed ledger, e.g. one sent back by a worker. """
+        positions = self.index.get_indexer(pd.DatetimeIndex(packed['date']))
+        self.log_many(positions, packed['shares'], packed['trade_price'])
+
+
+    def state(self):
+        """ Trade and running arrays up to size, for restore on a ledger over the same dates. """
+        state = {name: getattr(self, name)[:self.size].copy()
+                 for name in self.columns + ['held_shares', 'logged']}
+        state['last'] = self._last
+        return state
+
+
+    def restore(self, state):
+        for name in self.columns + ['held_shares', 'logged']:
+            getattr(self, name)[:len(state[name])] = state[name]
+        self._last = state['last']
+
+
+    def frame(self):
+        """ DataFrame view of the logged dates, in the old trade_log layout. """
+        logged = self.logged[:self.size]
+        return pd.DataFrame({col: getattr(self, col)[:self.size][logged] for col in self.columns},
+                            index=self.index[logged])
@@ -0,0 +1,39 @@
+# memory.py
+""" Compact dtypes for memory bound universes, and what a stock holds in memory. """
+import numpy as np
+import pandas as pd
+
+
+def compact_ohlc(ohlc):
+    """
+    Copy of an OHLC frame with float32 prices and returns, and volume as
+    the smallest integer type that holds it (float32 if it has gaps).
+    """
+    columns = {}
+    for name, col in ohlc.items():
+        if name == 'volume' and col.notna().all():
+            col = pd.to_numeric(col.round(), downcast='integer')
+        elif pd.api.types.is_float_dtype(col):
+            col = col.astype('float32')
+        columns[name] = col
+    return pd.DataFrame(columns, index=ohlc.index)
+
+
+def compact_signals(signal_df):
+    """
+    Only the signal column of a strategy's signal_df, as int8 when it holds
+    whole numbers (-1/0/1) and float32 otherwise.
+    """
+    signal = signal_df['signal']
+    values = signal.to_numpy()
+    if signal.notna().all() and (values == np.round(values)).all() and np.abs(values).max(initial=0) < 128:
+        signal = signal.astype('int8')
+    else:
+        signal = signal.astype('float32')
+    return signal.to_frame()
+
+
+def frame_bytes(df):
+    """ Bytes held by the columns of a DataFrame or Series, not its index. """
+    usage = df.memory_usage(index=False, deep=True)
+    return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
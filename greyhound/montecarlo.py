@@ -0,0 +1,88 @@
+# montecarlo.py
+import numpy as np
+import pandas as pd
+from .panel import Panel
+from .simulation import boundary_pass
+
+
+def block_bootstrap(returns, n_paths, length, block_size, rng):
+    """
+    Resample returns into a length x n_paths array. Each path is built from
+    blocks of block_size consecutive returns with random starts, which
+    keeps the short range autocorrelation of the series.
+    """
+    returns = np.asarray(returns, dtype='float64')
+    block_size = max(1, min(block_size, len(returns)))
+    n_blocks = -(-length // block_size)
+
+    starts = rng.integers(0, len(returns) - block_size + 1, size=(n_paths, n_blocks))
+    rows = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :length]
+    return returns[rows].T
+
+
+class MonteCarlo:
+    """
+    Robustness check of a strategy on synthetic price paths. The stock's
+    pct_ret is block bootstrapped into many paths starting from its first
+    price. The strategy and the position logic then run on all paths at
+    once, as dates x paths arrays: the strategy through the same code as
+    Panel, the trades through boundary_pass. Paths are processed in
+    batches of batch_size to bound memory.
+
+    Paths are built from the price column (data_map column_name), which
+    is also used to value held shares.
+
+    Defaults come from the [montecarlo] section:
+        n_paths = 1000
+        block_size = 20
+        batch_size = 1000
+        seed = 0
+    """
+    def __init__(self, stock, strategy, params=None, **kwargs):
+        _config = stock.config.get('montecarlo', {})
+        self.stock      = stock
+        self.strategy   = strategy
+        self.params     = params
+        self.n_paths    = kwargs.get('n_paths') or _config.get('n_paths', 1000)
+        self.block_size = kwargs.get('block_size') or _config.get('block_size', 20)
+        self.batch_size = kwargs.get('batch_size') or _config.get('batch_size', 1000)
+        seed = kwargs.get('seed', _config.get('seed'))
+        self.rng = np.random.default_rng(seed)
+
+        col_name = stock.config['data_map']['column_name']
+        self.price = stock.ohlc[col_name].to_numpy(dtype='float64')
+        self.returns = stock.ohlc['pct_ret'].to_numpy(dtype='float64')[1:]
+        self.returns = self.returns[~np.isnan(self.returns)]
+
+
+    def paths(self, n_paths):
+        """ dates x n_paths array of synthetic prices. """
+        length = len(self.price)
+        growth = 1.0 + block_bootstrap(self.returns, n_paths, length - 1, self.block_size, self.rng)
+        paths = np.empty((length, n_paths))
+        paths[0] = self.price[0]
+        paths[1:] = self.price[0] * np.cumprod(growth, axis=0)
+        return paths
+
+
+    def evaluate(self, paths):
+        """ PnL, max drawdown and trade count of every column of paths. """
+        config = self.stock.config
+        panel = Panel(self.stock.ohlc.index, range(paths.shape[1]), paths,
+                      np.ones(paths.shape, dtype='bool'))
+        signal = panel.run_strategy(self.strategy, config, self.params)['signal']
+
+        boundary = config['strategy']['buy_signal_boundary']
+        held, cash, min_cash, trades = boundary_pass(signal, paths, paths,
+                                                     config['strategy']['max_position_risk'],
+                                                     boundary, boundary)
+        return {'pnl': held * paths[-1] + cash, 'max_drawdown': min_cash, 'trades': trades}
+
+
+    def run(self):
+        """ DataFrame with one row per path. describe() gives the distributions. """
+        batches = []
+        for start in range(0, self.n_paths, self.batch_size):
+            n_paths = min(self.batch_size, self.n_paths - start)
+            batches.append(pd.DataFrame(self.evaluate(self.paths(n_paths))))
+        return pd.concat(batches, ignore_index=True)
@@ -0,0 +1,147 @@
+# panel.py
+from functools import partial
+import numpy as np
+import pandas as pd
+from .memory import compact_signals
+from .strategy import StrategyFactory
+
+
+def ewm_mean(values, mask, span):
+    """
+    Column wise equivalent of Series.ewm(span=span).mean() on a dates x
+    symbols array, stepping through the dates once with every symbol
+    updated together. Rows where mask is False are bars a symbol does not
+    have: they are skipped, leaving its state untouched, so each column
+    matches the mean over that symbol's own index. Masked rows are NaN.
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+
+    weighted = np.full(values.shape[1], np.nan)
+    old_wt = np.ones(values.shape[1])
+    nobs = np.zeros(values.shape[1], dtype='int64')
+    out = np.full(values.shape, np.nan)
+
+    # Same recursion as the pandas ewm kernel (adjust=True, ignore_na=False)
+    for t in range(values.shape[0]):
+        present = mask[t]
+        cur = values[t]
+        is_obs = present & (cur == cur)
+        has_weight = present & (weighted == weighted)
+
+        old_wt = np.where(has_weight, old_wt * decay, old_wt)
+        update = has_weight & is_obs
+        weighted = np.where(update & (weighted != cur),
+                            (old_wt * weighted + cur) / (old_wt + 1.0), weighted)
+        old_wt = np.where(update, old_wt + 1.0, old_wt)
+        weighted = np.where(is_obs & ~has_weight, cur, weighted)
+
+        nobs += is_obs
+        out[t] = np.where(present & (nobs > 0), weighted, np.nan)
+
+    return out
+
+
+def ema_strategy(close, mask, params):
+    """ Factors and signal of strategy.EMA for every column at once. """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ema = ewm_mean(close, mask, params['window'])
+        histogram = close - ema
+        hist_min = np.nanmin(histogram, axis=0)
+        hist_max = np.nanmax(histogram, axis=0)
+        hist_norm = (histogram - hist_min) / (hist_max - hist_min)
+        hist_mean = np.nanmean(hist_norm, axis=0)
+        signal = np.where(hist_norm <= (hist_mean * params['signal_factor']), 1.0, 0.0)
+
+    return {'ema': ema, 'histogram': histogram, 'hist_norm': hist_norm, 'signal': signal}
+
+
+def macd_strategy(close, mask, params):
+    """ Factors and signal of strategy.MACD for every column at once. """
+    macd_fast = ewm_mean(close, mask, params['macd_fast'])
+    macd_slow = ewm_mean(close, mask, params['macd_slow'])
+    macd      = macd_fast - macd_slow
+    macd_sig  = ewm_mean(macd, mask, params['macd_sig'])
+    histogram = macd - macd_sig
+    with np.errstate(invalid='ignore'):
+        signal = np.where(histogram <= params['histogram_min'], 1.0, 0.0)
+
+    return {'macd_fast': macd_fast, 'macd_slow': macd_slow, 'macd': macd,
+            'macd_sig': macd_sig, 'histogram': histogram, 'signal': signal}
+
+
+class Panel:
+    """
+    Cross sectional view of a universe: close prices of every symbol
+    aligned on the union of their dates, as one dates x symbols array, with
+    a mask of the bars each symbol actually has.
+
+    Strategies run once over the whole panel instead of once per Stock.
+    Results are only cut back into per stock signal DataFrames when a
+    stock's signals are asked for.
+    """
+    strategies = {
+        'ema': ema_strategy,
+        'macd': macd_strategy,
+    }
+
+    def __init__(self, dates, symbols, close, mask):
+        self.dates   = dates
+        self.symbols = list(symbols)
+        self.close   = close
+        self.mask    = mask
+        self.results = {}           # strategy name -> dict of factor arrays
+
+
+    @classmethod
+    def from_stocks(cls, stocks, col_name='close'):
+        """ Build panel from dict of symbol -> Stock. """
+        dates = pd.DatetimeIndex([])
+        for v in stocks.values():
+            dates = dates.union(v.ohlc.index).rename(v.ohlc.index.name)
+
+        close = np.full((len(dates), len(stocks)), np.nan)
+        mask = np.zeros((len(dates), len(stocks)), dtype='bool')
+        for j, v in enumerate(stocks.values()):
+            rows = dates.get_indexer(v.ohlc.index)
+            close[rows, j] = v.ohlc[col_name].to_numpy()
+            mask[rows, j] = True
+
+        return cls(dates, stocks.keys(), close, mask)
+
+
+    def run_strategy(self, name, config=None, params=None):
+        """
+        Compute strategy for every symbol. Params resolve as for a Stock
+        strategy: class defaults, then [strategy.<name>], then params.
+        """
+        try:
+            func = self.strategies[name]
+        except KeyError:
+            raise AssertionError("Strategy undefined")
+
+        params = StrategyFactory.strategies[name].read_params(config or {}, params)
+        self.results[name] = func(self.close, self.mask, params)
+        return self.results[name]
+
+
+    def frame(self, name, symbol):
+        """ Signal DataFrame of one symbol, same layout as Stock strategies. """
+        j = self.symbols.index(symbol)
+        rows = self.mask[:, j]
+        return pd.DataFrame({k: v[rows, j] for k, v in self.results[name].items()},
+                            index=self.dates[rows])
+
+
+    def compact_frame(self, name, symbol):
+        return compact_signals(self.frame(name, symbol))
+
+
+    def scatter(self, stocks, name):
+        """
+        Register the strategy results with each stock. The per stock signal
+        DataFrame is only built when stock.signals[name] is first read.
+        """
+        for symbol, stock in stocks.items():
+            frame = self.compact_frame if stock.compact else self.frame
+            stock.signals.defer(name, partial(frame, name, symbol))
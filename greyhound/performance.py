@@ -0,0 +1,50 @@
+# performance.py
+""" Per tick performance metrics computed over whole time series at once. """
+import numpy as np
+
+TRADING_DAYS = 252          # periods per year used to annualize Sharpe
+SHARPE_WINDOW = 63          # rolling Sharpe window, about one quarter of bars
+
+metrics = ['held_shares', 'cash_position', 'share_value', 'pnl', 'drawdown',
+           'max_drawdown', 'sharpe', 'sharpe_expanding', 'exposure']
+
+
+def _sharpe(mean, std, periods):
+    sharpe = (mean / std) * np.sqrt(periods)
+    return sharpe.replace([np.inf, -np.inf], np.nan)
+
+
+def equity_curve(held_shares, cash_position, price, capital,
+                 window=SHARPE_WINDOW, periods=TRADING_DAYS):
+    """
+    Build the equity curve from held shares, cash and price. Inputs are
+    either Series (one stock) or DataFrames of dates x symbols, and every
+    metric comes back in the same shape.
+      - pnl is cash plus the value of held shares
+      - drawdown is pnl below its running peak, max_drawdown the running
+        worst of it
+      - sharpe is annualized on the change in pnl as a return on capital,
+        over a rolling window and expanding from the first date
+      - exposure is the gross value of held shares as a fraction of capital
+    """
+    share_value = held_shares * price
+    pnl = cash_position + share_value
+
+    drawdown = pnl - pnl.cummax().clip(lower=0)
+    max_drawdown = drawdown.cummin()
+
+    returns = pnl.diff().fillna(0) / capital
+    rolling = returns.rolling(window, min_periods=2)
+    expanding = returns.expanding(min_periods=2)
+
+    return {
+        'held_shares': held_shares,
+        'cash_position': cash_position,
+        'share_value': share_value,
+        'pnl': pnl,
+        'drawdown': drawdown,
+        'max_drawdown': max_drawdown,
+        'sharpe': _sharpe(rolling.mean(), rolling.std(), periods),
+        'sharpe_expanding': _sharpe(expanding.mean(), expanding.std(), periods),
+        'exposure': share_value.abs() / capital,
+    }
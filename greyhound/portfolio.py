@@ -0,0 +1,131 @@
+# portfolio.py
+import math
+import numpy as np
+import pandas as pd
+from .panel import Panel
+
+
+def portfolio_pass(signal, spot_price, value_price, mask, boundary, symbol_limit,
+                   capital=None, gross_limit=None):
+    """
+    Trade every symbol of a dates x symbols panel against one shared book,
+    stepping through the dates once with all symbols updated together.
+
+    Per symbol the rule is the one Simulation uses: a signal >= boundary
+    buys up to symbol_limit of exposure, valued at value_price; otherwise a
+    non-NaN signal sells the whole position. On each date sells go first,
+    then buys are scaled down together, if needed, to fit both the cash
+    left of capital and the room left under gross_limit of total exposure.
+    None means no limit, in which case every symbol trades as if it were
+    simulated alone. Rows where mask is False are bars a symbol does not
+    have; its shares keep their last value.
+
+    Return dates x symbols array of shares traded and the per date cash
+    flow, i.e. cash relative to the starting capital.
+    """
+    capital = math.inf if capital is None else capital
+    gross_limit = math.inf if gross_limit is None else gross_limit
+
+    n_dates, n_symbols = signal.shape
+    held = np.zeros(n_symbols)
+    last_value = np.zeros(n_symbols)
+    cash = 0.0
+    traded = np.zeros((n_dates, n_symbols))
+    cash_flow = np.zeros(n_dates)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for t in range(n_dates):
+            present = mask[t]
+            sig, spot = signal[t], spot_price[t]
+            last_value = np.where(present & (value_price[t] == value_price[t]), value_price[t], last_value)
+
+            is_buy = present & (sig >= boundary) & (spot == spot)
+            is_sell = present & ~is_buy & (sig <= boundary)
+
+            # Sells first, they free cash and exposure for the buys
+            shares = np.where(is_sell, held * -1, 0.0)
+            cash += (shares[is_sell] * spot[is_sell]).sum() * -1
+            held += shares
+
+            exposure = np.abs(held * last_value)
+            risk_allowed = symbol_limit - exposure
+            buys = np.where(is_buy & (risk_allowed > 0), np.floor(risk_allowed / spot), 0.0)
+
+            cost = (buys[is_buy] * spot[is_buy]).sum()
+            budget = max(min(capital + cash, gross_limit - exposure.sum()), 0.0)
+            if cost > budget:
+                buys = np.floor(buys * (budget / cost))
+                cost = (buys[is_buy] * spot[is_buy]).sum()
+
+            cash -= cost
+            held += buys
+            traded[t] = shares + buys
+            cash_flow[t] = cash
+
+    return traded, cash_flow
+
+
+class PortfolioSimulation:
+    """
+    Simulate a whole universe as one portfolio on a single date axis. The
+    strategy runs on a Panel of every stock and portfolio_pass trades all
+    symbols date by date against a shared cash and risk budget, instead of
+    each stock alone against its own max_position_risk.
+
+    Limits come from the [portfolio] section:
+        capital = 100000        # cash to trade with (0: unlimited)
+        max_gross_risk = 50000  # total exposure of held shares (0: unlimited)
+        symbol_limit = 10000    # exposure of one symbol, default max_position_risk
+    """
+    def __init__(self, universe, strategy, params=None, **kwargs):
+        self.universe = universe
+        self.strategy = strategy
+        self.params   = params
+        self.logger   = universe.logger
+
+        config = universe.config
+        _config = config.get('portfolio', {})
+        self.capital        = kwargs.get('capital', _config.get('capital')) or None
+        self.gross_limit    = kwargs.get('max_gross_risk', _config.get('max_gross_risk')) or None
+        self.symbol_limit   = (kwargs.get('symbol_limit', _config.get('symbol_limit')) or
+                               config['strategy']['max_position_risk'])
+        self.boundary       = config['strategy']['buy_signal_boundary']
+        self.col_name       = config['data_map']['column_name']
+
+        self.trades = None          # dates x symbols shares traded
+        self.held   = None          # dates x symbols shares held
+
+
+    def run(self):
+        """
+        Return DataFrame by date of cash, share value, PnL and gross
+        exposure of the portfolio.
+        """
+        stocks = self.universe.stocks
+        panel = Panel.from_stocks(stocks)
+        signal = panel.run_strategy(self.strategy, self.universe.config, self.params)['signal']
+        spot = panel.close if self.col_name == 'close' else Panel.from_stocks(stocks, self.col_name).close
+
+        traded, cash = portfolio_pass(signal, spot, panel.close, panel.mask, self.boundary,
+                                      self.symbol_limit, self.capital, self.gross_limit)
+
+        self.trades = pd.DataFrame(traded, index=panel.dates, columns=panel.symbols)
+        self.held = self.trades.cumsum()
+        value = self.held * pd.DataFrame(panel.close, index=panel.dates, columns=panel.symbols).ffill()
+        share_value = value.sum(axis=1)
+
+        self.logger.info(f'portfolio: {int((traded != 0).sum())} trades over {len(panel.symbols)} symbols')
+        return pd.DataFrame({'cash_position': cash,
+                             'share_value': share_value,
+                             'pnl': cash + share_value,
+                             'exposure': value.abs().sum(axis=1)}, index=panel.dates)
+
+
+    def scatter(self):
+        """ Log each symbol's portfolio trades into its Stock's ledger. """
+        for symbol, stock in self.universe.stocks.items():
+            trades = self.trades[symbol].reindex(stock.ohlc.index)
+            traded = (trades != 0).to_numpy()
+            stock.reset_trades()
+            stock.log_trades(stock.ohlc.index[traded], trades.to_numpy()[traded],
+                             stock.ohlc[self.col_name].to_numpy()[traded])
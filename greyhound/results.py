@@ -0,0 +1,76 @@
+# results.py
+import time
+from collections import namedtuple
+
+
+class BacktestResult(namedtuple('BacktestResult',
+                                ['symbol', 'pnl', 'max_drawdown', 'trades', 'bars', 'ledger', 'error'],
+                                defaults=(None, None))):
+    """
+    Fixed schema result of one symbol's backtest. Small enough to send
+    back from a worker in place of the whole Stock. The trade ledger is
+    only attached, as a packed structured array, when asked for.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_stock(cls, stock, keep_ledger=False):
+        return cls(stock.symbol, float(stock.calc_pnl()), float(stock.get_max_drawdown()),
+                   stock.ledger.trade_count(), len(stock.ohlc),
+                   stock.ledger.packed() if keep_ledger else None)
+
+    @classmethod
+    def failed(cls, symbol, error):
+        return cls(symbol, float('nan'), float('nan'), 0, 0, None, str(error))
+
+
+class ResultCollector:
+    """
+    Aggregate backtest results as they arrive. Only running totals are
+    kept, so memory stays flat however many symbols stream through.
+    """
+    def __init__(self, total=None):
+        self.total        = total
+        self.count        = 0
+        self.failed       = 0
+        self.bars         = 0
+        self.trades       = 0
+        self.pnl          = 0.0
+        self.max_drawdown = 0.0
+        self.started      = time.perf_counter()
+
+    def add(self, result):
+        self.count += 1
+        if result.error is not None:
+            self.failed += 1
+            return result
+
+        self.bars         += result.bars
+        self.trades       += result.trades
+        self.pnl          += result.pnl
+        self.max_drawdown  = min(self.max_drawdown, result.max_drawdown)
+        return result
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def throughput(self):
+        """ Symbols per second since the collector was created. """
+        elapsed = self.elapsed()
+        return self.count / elapsed if elapsed else 0.0
+
+    def progress(self):
+        total = self.total if self.total is not None else '?'
+        return f'[{self.count}/{total}] {self.throughput():.1f} sym/s'
+
+    def summary(self):
+        return {
+            'symbols': self.count,
+            'failed': self.failed,
+            'bars': self.bars,
+            'trades': self.trades,
+            'pnl': self.pnl,
+            'max_drawdown': self.max_drawdown,
+            'elapsed': self.elapsed(),
+            'symbols_per_sec': self.throughput(),
+        }
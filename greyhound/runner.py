@@ -0,0 +1,199 @@
+# runner.py
+import heapq
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from .instrument import instruments
+from .results import BacktestResult
+from .sharedmem import SharedOHLC
+from .simulation import Simulation
+from .stock import Stock
+from .strategy import StrategyFactory
+
+
+def backtest_stock(stock, strategy, params=None, engine=None, keep_ledger=False):
+    """ Run strategy and simulation on one stock and return its result record. """
+    try:
+        stock.reset_trades()
+        StrategyFactory().create_strategy(stock, strategy, params=params)
+        Simulation(stock, engine).paper_trade(strategy)
+        return BacktestResult.from_stock(stock, keep_ledger)
+    except Exception as e:
+        return BacktestResult.failed(stock.symbol, e)
+
+
+def chunk_by_cost(costs, n_chunks):
+    """
+    Split symbols into at most n_chunks lists of roughly equal total cost.
+    costs is a dict of symbol -> bar count. Largest symbols are placed
+    first, each onto the currently lightest chunk. Chunks come back
+    heaviest first so the longest work starts earliest.
+    """
+    n_chunks = max(1, min(n_chunks, len(costs)))
+    heap = [(0, i, []) for i in range(n_chunks)]
+    for symbol in sorted(costs, key=costs.get, reverse=True):
+        load, i, chunk = heapq.heappop(heap)
+        chunk.append(symbol)
+        heapq.heappush(heap, (load + costs[symbol], i, chunk))
+
+    return [chunk for load, i, chunk in sorted(heap, reverse=True) if chunk]
+
+
+# Per process state for the process backend, set by the pool initializer.
+# Without a shared memory spec (lazy universes) workers read the store.
+_worker = {}
+
+def _init_worker(spec, config, date_start, date_end):
+    instruments.configure(config)
+    # Forked workers inherit the parent's stats, which the parent already holds
+    instruments.clear()
+    _worker['shared'] = SharedOHLC.attach(spec) if spec else None
+    _worker['config'] = config
+    _worker['dates']  = (date_start, date_end)
+
+def _worker_stock(symbol):
+    if _worker['shared'] is not None:
+        return _worker['shared'].stock(symbol, _worker['config'])
+    return Stock(symbol, *_worker['dates'], config=_worker['config'])
+
+def _run_chunk(symbols, strategy, params, engine, keep_ledger):
+    """ Results of a chunk of symbols and a snapshot of this worker's instruments. """
+    results = []
+    with instruments.profile('chunk'):
+        for symbol in symbols:
+            try:
+                with instruments.timer('runner.stock', symbol):
+                    stock = _worker_stock(symbol)
+            except Exception as e:
+                results.append(BacktestResult.failed(symbol, e))
+                continue
+            results.append(backtest_stock(stock, strategy, params, engine, keep_ledger))
+            del stock
+
+    if instruments.enabled:
+        # what it costs to send the results back to the parent
+        with instruments.timer('runner.pickle'):
+            instruments.count('runner.result_bytes', len(pickle.dumps(results)))
+    return results, instruments.snapshot()
+
+def _run_local_chunk(stocks, symbols, strategy, params, engine, keep_ledger):
+    # Fetch each stock inside the thread so lazy universes load on demand
+    results = []
+    for symbol in symbols:
+        try:
+            stock = stocks[symbol]
+        except Exception as e:
+            results.append(BacktestResult.failed(symbol, e))
+            continue
+        results.append(backtest_stock(stock, strategy, params, engine, keep_ledger))
+    return results
+
+
+class BacktestRunner:
+    """
+    Run a strategy over every stock of a Universe on a pluggable backend.
+      - serial:  one symbol after another in this process
+      - thread:  chunks on a thread pool, stocks are shared in place. Only
+                 worth it with the vector engine, whose NumPy passes release
+                 the GIL; the loop engine is pure Python and runs no faster
+                 than serial
+      - process: chunks on a process pool, OHLC is shared with the workers
+                 through shared memory (lazy universes: read by the workers
+                 themselves) and only result records come back
+
+    With release the process backend drops the universe's stocks once
+    their OHLC is in shared memory, so the parent holds one copy of the
+    prices rather than two. The universe is empty afterwards, and with
+    keep_ledger the ledgers stay on the results instead of being logged
+    into the stocks.
+
+    Work is split into chunks balanced by bar count rather than one task
+    per symbol. A symbol that raises, or a worker process that dies, is
+    reported as a failed result instead of aborting the run.
+    """
+    def __init__(self, universe, strategy, params=None, engine=None, keep_ledger=False, release=False):
+        self.universe    = universe
+        self.strategy    = strategy
+        self.params      = params
+        self.engine      = engine
+        self.keep_ledger = keep_ledger
+        self.release     = release
+        self.logger      = universe.logger
+
+
+    def chunks(self, n_chunks):
+        return chunk_by_cost(self.universe.bar_counts(), n_chunks)
+
+
+    def run(self, backend='process', workers=None, chunks_per_worker=4):
+        """ Yield a BacktestResult per symbol, in completion order. """
+        try:
+            func = getattr(self, f'_run_{backend}')
+        except AttributeError:
+            raise AssertionError("Backend undefined")
+
+        if not self.universe.stocks:
+            return
+        workers = workers or os.cpu_count()
+        instruments.configure(self.universe.config)
+        with instruments.profile('backtest'):
+            yield from func(workers, chunks_per_worker)
+
+
+    def _run_serial(self, workers, chunks_per_worker):
+        yield from _run_local_chunk(self.universe.stocks, list(self.universe.stocks), self.strategy,
+                                    self.params, self.engine, self.keep_ledger)
+
+
+    def _run_thread(self, workers, chunks_per_worker):
+        stocks = self.universe.stocks
+        with ThreadPoolExecutor(workers) as pool:
+            futures = [pool.submit(_run_local_chunk, stocks, chunk, self.strategy,
+                                   self.params, self.engine, self.keep_ledger)
+                       for chunk in self.chunks(workers * chunks_per_worker)]
+            for future in as_completed(futures):
+                yield from future.result()
+
+
+    def _run_process(self, workers, chunks_per_worker):
+        workers = min(workers, len(self.universe.stocks))
+        # Lazy universes are never loaded in full here, workers read the
+        # store one symbol at a time instead.
+        with instruments.timer('runner.shared_create'):
+            shared = None if self.universe.lazy else SharedOHLC.create(self.universe.stocks)
+        try:
+            # Bar counts are needed for chunking before the stocks go
+            chunks = self.chunks(workers * chunks_per_worker)
+            if shared and self.release:
+                # prices now live in shared memory only
+                self.universe.stocks.clear()
+
+            initargs = (shared.spec if shared else None, self.universe.config,
+                        self.universe.date_start, self.universe.date_end)
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+                futures = {pool.submit(_run_chunk, chunk, self.strategy, self.params,
+                                       self.engine, self.keep_ledger): chunk
+                           for chunk in chunks}
+                for future in as_completed(futures):
+                    try:
+                        results, snapshot = future.result()
+                        instruments.merge(snapshot)
+                    except Exception as e:
+                        # BrokenProcessPool when a worker dies, fail its chunk only
+                        self.logger.error(f'chunk {futures[future]} failed: {e!r}')
+                        results = [BacktestResult.failed(k, e) for k in futures[future]]
+                    for result in results:
+                        with instruments.timer('runner.scatter', result.symbol):
+                            self._scatter(result)
+                        yield result
+        finally:
+            if shared:
+                shared.close()
+
+
+    def _scatter(self, result):
+        """ Copy a worker's packed ledger into the parent's Stock. """
+        if result.ledger is not None and result.symbol in self.universe.stocks and not self.universe.lazy:
+            stock = self.universe.stocks[result.symbol]
+            stock.reset_trades()
+            stock.ledger.unpack(result.ledger)
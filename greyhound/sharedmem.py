@@ -0,0 +1,105 @@
+# sharedmem.py
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .stock import Stock
+
+
+def _attach_segment(name):
+    # Workers only read the segments, the creating process owns cleanup.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedOHLC:
+    """
+    OHLC prices of a whole universe packed into two shared memory segments:
+    one float64 block of columns x rows holding every symbol back to back,
+    and one int64 block holding the matching timestamps.
+
+    The parent process creates it from loaded Stock objects and hands the
+    small, picklable spec to workers. Workers attach by segment name and
+    build Stock objects whose OHLC frames are views on the shared buffers,
+    so no price data is pickled or copied.
+    """
+    def __init__(self, spec, data_shm, index_shm, owner=False):
+        self.spec      = spec
+        self.columns   = spec['columns']
+        self.offsets   = spec['offsets']
+        self._data_shm  = data_shm
+        self._index_shm = index_shm
+        self._owner     = owner
+
+        rows = spec['rows']
+        self.data  = np.ndarray((len(self.columns), rows), dtype='float64', buffer=data_shm.buf)
+        self.index = np.ndarray((rows,), dtype='int64', buffer=index_shm.buf)
+
+
+    @classmethod
+    def create(cls, stocks):
+        """ Copy OHLC of a dict of symbol -> Stock into new shared segments. """
+        first = next(iter(stocks.values())).ohlc
+        columns = list(first.columns)
+        rows = sum(len(v.ohlc) for v in stocks.values())
+
+        # SharedMemory refuses zero sized segments
+        data_shm  = shared_memory.SharedMemory(create=True, size=max(1, rows * len(columns) * 8))
+        index_shm = shared_memory.SharedMemory(create=True, size=max(1, rows * 8))
+
+        offsets, start = {}, 0
+        for k,v in stocks.items():
+            offsets[k] = (start, start + len(v.ohlc))
+            start += len(v.ohlc)
+
+        spec = {'data': data_shm.name, 'index': index_shm.name,
+                'columns': columns, 'rows': rows, 'offsets': offsets,
+                'index_name': first.index.name}
+        shared = cls(spec, data_shm, index_shm, owner=True)
+
+        for k,v in stocks.items():
+            start, stop = offsets[k]
+            shared.data[:, start:stop] = v.ohlc[columns].to_numpy(dtype='float64').T
+            shared.index[start:stop] = v.ohlc.index.as_unit('ns').asi8
+
+        return shared
+
+
+    @classmethod
+    def attach(cls, spec):
+        """ Attach to segments created by another process. """
+        return cls(spec, _attach_segment(spec['data']), _attach_segment(spec['index']))
+
+
+    def symbols(self):
+        return list(self.offsets.keys())
+
+
+    def frame(self, symbol):
+        """ OHLC DataFrame of symbol backed by the shared buffers, no copy. """
+        start, stop = self.offsets[symbol]
+        index = pd.DatetimeIndex(self.index[start:stop].view('datetime64[ns]'), copy=False,
+                                 name=self.spec.get('index_name'))
+        return pd.DataFrame(self.data[:, start:stop].T, index=index, columns=self.columns, copy=False)
+
+
+    def stock(self, symbol, config):
+        """ Stock object wrapping the shared OHLC of symbol. """
+        return Stock(symbol, None, None, config=config, ohlc=self.frame(symbol))
+
+
+    def close(self):
+        """ Detach from the segments. The creating process also frees them. """
+        self.data = self.index = None
+        self._data_shm.close()
+        self._index_shm.close()
+        if self._owner:
+            self._data_shm.unlink()
+            self._index_shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,9 +1,91 @@
 # simulation.py
 import locale
+import logging
 import math
+import numpy as np
+import pandas as pd
+from .instrument import instruments
+from .journal import open_journal, RISK_CHECK, TRADE
 from .utils import read_config
 from .applogger import get_logger
 
+
+def position_pass(signal, spot_price, value_price, risk_limit, boundary):
+    """
+    Single linear pass over NumPy arrays that reproduces the trade sizing of
+    Simulation._paper_trade_loop. Returns a boolean array of bars on which a
+    trade is logged, the signed share count traded on each bar and the
+    risk allowed by the risk check of each of those bars.
+    """
+    signal = np.asarray(signal, dtype='float64').tolist()
+    spot_price = np.asarray(spot_price, dtype='float64').tolist()
+    value_price = np.asarray(value_price, dtype='float64').tolist()
+
+    traded = np.zeros(len(signal), dtype='bool')
+    shares = np.zeros(len(signal), dtype='float64')
+    risk = np.full(len(signal), np.nan)
+    held = 0.0
+
+    for i, sig in enumerate(signal):
+        risk_allowed = risk_limit - abs(held * value_price[i])
+        if sig >= boundary:                 # Buy signal
+            trade_shares = math.floor(risk_allowed / spot_price[i]) if risk_allowed > 0 else 0
+        elif sig <= boundary:               # Sell signal, dump entire position
+            trade_shares = held * -1
+        else:                               # NaN signal, no trade
+            continue
+        traded[i] = True
+        shares[i] = trade_shares
+        risk[i] = risk_allowed
+        held += trade_shares
+
+    return traded, shares, risk
+
+
+def boundary_pass(signal, spot_price, value_price, risk_limit, buy_boundary, sell_boundary):
+    """
+    Trade sizing of position_pass for many runs at once. The bars are
+    walked once and every run is updated together as one array. Runs are
+    either (buy, sell) boundary pairs over one series, or, with signal and
+    prices given as bars x paths arrays, one price path each.
+
+    A bar buys if its signal >= buy boundary, else sells the whole position
+    if <= sell boundary, else does not trade; with equal boundaries this is
+    the rule Simulation uses. No trades are logged: return the final shares
+    held, final cash, lowest cash and number of non-zero trades per run.
+    """
+    signal = np.asarray(signal, dtype='float64')
+    spot_price = np.asarray(spot_price, dtype='float64')
+    value_price = np.asarray(value_price, dtype='float64')
+    buy_boundary = np.asarray(buy_boundary, dtype='float64')
+    sell_boundary = np.asarray(sell_boundary, dtype='float64')
+
+    shape = np.broadcast_shapes(signal.shape[1:], buy_boundary.shape, sell_boundary.shape)
+    held = np.zeros(shape)
+    cash = np.zeros(shape)
+    min_cash = np.zeros(shape)
+    trades = np.zeros(shape, dtype='int64')
+
+    if signal.ndim == 1:
+        # Python floats step faster than NumPy scalars
+        signal, spot_price, value_price = signal.tolist(), spot_price.tolist(), value_price.tolist()
+
+    for sig, spot, value in zip(signal, spot_price, value_price):
+        # a NaN signal neither buys nor sells, so its bar trades 0 shares
+        risk_allowed = risk_limit - np.abs(held * value)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            buy_shares = np.where(risk_allowed > 0, np.floor(risk_allowed / spot), 0.0)
+        shares = np.where(sig >= buy_boundary, buy_shares,
+                          np.where(sig <= sell_boundary, held * -1, 0.0))
+
+        held += shares
+        cash += (shares * spot) * -1
+        np.minimum(min_cash, cash, out=min_cash)
+        trades += shares != 0
+
+    return held, cash, min_cash, trades
+
+
 class Simulation:
     """
     Step thru each price tick in a stock and perform the following:
@@ -11,8 +93,22 @@ class Simulation:
       - Calculate existing risk on current position and determine size of risk
         desired to be added or removed from current position.
       - Trade stock and update book and log trade.
+
+    Two engines are available. 'loop' walks the OHLC index one date at a time
+    and queries the trade log on each step. 'vector' sizes every trade in one
+    linear pass over NumPy arrays and writes the trade log in bulk. Both
+    produce the same trade log.
+
+    stream() switches a simulation to bar by bar mode: it follows a
+    streaming strategy and trades each bar pushed into the stock as it
+    arrives, with the same sizing as the engines above.
+
+    With a [journal] directory configured, all of them record each risk
+    check and trade in the journal in place of per bar text logs.
     """
-    def __init__(self, stock_obj):
+    engines = ('loop', 'vector')
+
+    def __init__(self, stock_obj, engine=None):
 
         self.stock = stock_obj
 
@@ -21,48 +117,132 @@ class Simulation:
         self.risk_limit = self.stock.config['strategy']['max_position_risk']
         self.buy_signal_boundary  = self.stock.config['strategy']['buy_signal_boundary']
         self.sell_signal_boundary = self.stock.config['strategy']['sell_signal_boundary']
+        self.engine = engine or self.stock.config['strategy'].get('engine', 'loop')
         self.logger = get_logger(f'simul-{self.stock.symbol}', log_level)
+        self.journal = open_journal(self.stock.config)
 
-    def _risk_check(self, signal, trade_date):
+        if self.engine not in self.engines:
+            raise AssertionError("Engine undefined")
+
+    def _verbose(self):
+        """ Log each bar as text, unless a journal records the bars instead. """
+        return self.journal is None and self.logger.isEnabledFor(logging.INFO)
 
-        existing_position_risk = self.stock.get_held_share_value(trade_date)
+    def _risk_check(self, signal, trade_date):
+        """ Shares to trade on signal at trade_date, a date or an integer position. """
+        pos = self.stock.position(trade_date)
+        existing_position_risk = self.stock.get_held_share_value(pos)
         risk_allowed = self.risk_limit - abs(existing_position_risk)
-        self.logger.info(f'{self.stock.symbol.upper()}  Allowed risk: ${locale.format_string("%.2f", risk_allowed)}')
+        verbose = self._verbose()
+        if verbose:
+            trade_date = self.stock.ohlc.index[pos]
+            self.logger.info(f'{self.stock.symbol.upper()}  Allowed risk: ${locale.format_string("%.2f", risk_allowed)}')
 
+        trade_size = 0
         if signal == 'buy' and risk_allowed > 0:
-            trade_size = self._calc_trade_size(risk_allowed, trade_date)
-            self.logger.info(f'{self.stock.symbol.upper()} Buy {trade_size} shares on {trade_date}.')
-            return trade_size
+            trade_size = self._calc_trade_size(risk_allowed, pos)
+            if verbose:
+                self.logger.info(f'{self.stock.symbol.upper()} Buy {trade_size} shares on {trade_date}.')
 
         elif signal == 'sell':
             # dump entire position
-            trade_size = self.stock.trade_log.shares.loc[:trade_date].sum()
-            self.logger.info(f'{self.stock.symbol.upper()} Sell {trade_size} shares on {trade_date}.')
-            return trade_size
+            trade_size = self.stock.get_held_shares(pos)
+            if verbose:
+                self.logger.info(f'{self.stock.symbol.upper()} Sell {trade_size} shares on {trade_date}.')
 
-        return 0
+        if self.journal:
+            self.journal.record(RISK_CHECK, self.stock.ohlc.index[pos], self.stock.symbol,
+                                trade_size, risk=risk_allowed)
+        return trade_size
 
     def _calc_trade_size(self, risk_allowed, trade_date):
 
-        spot_price = self.stock.ohlc[self.col_name].loc[trade_date]
+        spot_price = self.stock.ohlc[self.col_name].to_numpy()[self.stock.position(trade_date)]
 
         return math.floor(risk_allowed / spot_price)
 
     def paper_trade(self, signal_name):
         ''' signal check -> risk check -> get trade size -> log trade '''
-        symbol = self.stock.symbol
-        signal = self.stock.signals[signal_name].signal
+        with instruments.timer(f'simulation.{self.engine}', self.stock.symbol):
+            if self.engine == 'vector':
+                return self._paper_trade_vector(signal_name)
+            return self._paper_trade_loop(signal_name)
 
-        for trade_date in self.stock.ohlc.index:
-
-            spot_price = self.stock.ohlc[self.col_name].loc[trade_date]
-
-            if signal.loc[trade_date] >= self.buy_signal_boundary: # Buy signal
-                trade_shares = self._risk_check('buy', trade_date)
-                self.logger.info(f'{self.stock.symbol.upper()} traded {trade_shares} @ {spot_price} on {trade_date}')
-                self.stock.log_trade(trade_date, trade_shares, spot_price)
-
-            elif signal.loc[trade_date] <= self.buy_signal_boundary:   # Sell signal
-                trade_shares = self._risk_check('sell', trade_date)
-                self.logger.info(f'{self.stock.symbol.upper()} traded {trade_shares} @ {spot_price} on {trade_date}')
-                self.stock.log_trade(trade_date, (trade_shares * -1), spot_price)
+    def _paper_trade_loop(self, signal_name):
+        symbol = self.stock.symbol
+        index = self.stock.ohlc.index
+        spot = self.stock.ohlc[self.col_name].to_numpy()
+        signal = self.stock.signals[signal_name].signal.reindex(index).to_numpy()
+        verbose = self._verbose()
+
+        # Walk the bars by integer position, dates are only looked up for output
+        for pos in range(len(index)):
+
+            spot_price = spot[pos]
+
+            if signal[pos] >= self.buy_signal_boundary: # Buy signal
+                trade_shares = self._risk_check('buy', pos)
+
+            elif signal[pos] <= self.buy_signal_boundary:   # Sell signal
+                trade_shares = self._risk_check('sell', pos) * -1
+
+            else:
+                continue
+
+            if verbose:
+                self.logger.info(f'{symbol.upper()} traded {trade_shares} @ {spot_price} on {index[pos]}')
+            if self.journal:
+                self.journal.record(TRADE, index[pos], symbol, trade_shares, spot_price)
+            self.stock.log_trade(pos, trade_shares, spot_price)
+
+    def _paper_trade_vector(self, signal_name):
+        ohlc = self.stock.ohlc
+        signal = self.stock.signals[signal_name].signal.reindex(ohlc.index)
+        spot_price = ohlc[self.col_name].to_numpy()
+
+        traded, shares, risk = position_pass(signal.to_numpy(), spot_price, ohlc['close'].to_numpy(),
+                                             self.risk_limit, self.buy_signal_boundary)
+
+        self.stock.log_trades(ohlc.index[traded], shares[traded], spot_price[traded])
+        if self.journal:
+            # a risk check sizes a sell as the shares held, positive
+            dates = ohlc.index[traded]
+            self.journal.record_many(RISK_CHECK, dates, self.stock.symbol,
+                                     np.abs(shares[traded]), risk=risk[traded])
+            self.journal.record_many(TRADE, dates, self.stock.symbol,
+                                     shares[traded], spot_price[traded])
+        self.logger.info(f'{self.stock.symbol.upper()} logged {traded.sum()} trades')
+
+    def stream(self, strategy, warm_up=True):
+        """
+        Trade every bar pushed into the stock from now on, on the signal of
+        strategy, a streaming strategy of the stock (see streaming.py).
+        With warm_up the bars the stock already has are traded first, in
+        one pass, so the position carries into the live bars.
+        """
+        self.strategy = strategy
+        if warm_up:
+            self._paper_trade_vector(strategy.strategy_name)
+        self.stock.streams.append(self)
+
+    def on_bar(self, pos, trade_date, bar):
+        """ Size and log the trade of one new bar, O(1). """
+        signal = self.strategy.signal
+        spot_price = bar[self.col_name]
+        ledger = self.stock.ledger
+
+        risk_allowed = self.risk_limit - abs(ledger.held_at(pos) * bar['close'])
+        if signal >= self.buy_signal_boundary:              # Buy signal
+            trade_shares = math.floor(risk_allowed / spot_price) if risk_allowed > 0 else 0
+        elif signal <= self.buy_signal_boundary:            # Sell signal, dump entire position
+            trade_shares = ledger.held_at(pos) * -1
+        else:                                               # NaN signal, no trade
+            return
+
+        ledger.log(pos, trade_shares, spot_price)
+        if self.journal:
+            trade_date = pd.Timestamp(trade_date)
+            self.journal.record(RISK_CHECK, trade_date, self.stock.symbol, abs(trade_shares), risk=risk_allowed)
+            self.journal.record(TRADE, trade_date, self.stock.symbol, trade_shares, spot_price)
+        elif trade_shares:
+            self.logger.info(f'{self.stock.symbol.upper()} traded {trade_shares} @ {spot_price} on {trade_date}')
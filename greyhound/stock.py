@@ -1,10 +1,51 @@
 # stock.py
+import numpy as np
 import pandas as pd
+from .cache import fingerprint
+from .datasource import load_columns, open_source
+from .factors import FactorGraph
+from .instrument import instruments
+from .ledger import TradeLedger
+from .memory import compact_ohlc, frame_bytes
+from .performance import equity_curve, metrics, SHARPE_WINDOW, TRADING_DAYS
+from .streaming import BarBuffer
 from .utils import read_config
 from .applogger import get_logger
 pd.options.mode.chained_assignment = None
 
 
+class SignalStore(dict):
+    """
+    Dict of strategy name -> signal DataFrame. A name can also be deferred
+    to a producer function, which builds the DataFrame on first access.
+    Deferred names are not listed by keys() until they have been built.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = {}
+
+    def defer(self, name, producer):
+        super().pop(name, None)
+        self._pending[name] = producer
+
+    def __missing__(self, name):
+        if name not in self._pending:
+            raise KeyError(name)
+        signal_df = self._pending.pop(name)()
+        super().__setitem__(name, signal_df)
+        return signal_df
+
+    def __setitem__(self, name, signal_df):
+        self._pending.pop(name, None)
+        super().__setitem__(name, signal_df)
+
+    def __contains__(self, name):
+        return super().__contains__(name) or name in self._pending
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+
 class Stock:
     """
     Create object for storing both historical OHLC data but also
@@ -13,30 +54,95 @@ class Stock:
     Can be instantiated on its own but is typically called from a
     Universe object and the configuration is passed into the Stock
     object.
+
+    With compact=True (or [memory] compact in the config) prices and
+    returns are kept as float32 and volume as an integer, and strategies
+    keep only an int8 signal column, dropping their factors once the
+    signal is built. Results can differ from full precision ones in the
+    last cent of a price. Code that reads factor columns of
+    signals[name], e.g. threshold_search on 'histogram' or plotting an
+    indicator, needs a stock loaded without compact.
     """
 
     def __init__(self, symbol, date_start, date_end, **kwargs):
         """
         Create object -> Load data -> Snip dates
+
+        An already loaded OHLC frame (e.g. a view on shared memory) can be
+        passed with the ohlc keyword, in which case the data source is not
+        read.
         """
         self.symbol     = symbol.lower()
         self.ohlc       = None              # df OHLC prices
-        self.trade_log  = None              # df shares traded
-        self.signals    = {}                # dict of dfs per strategy (ema, macd, etc)
+        self.ledger     = None              # preallocated trade ledger
+        self.signals    = SignalStore()     # dict of dfs per strategy (ema, macd, etc)
+        self.streams    = []                # called by push_bar: streaming strategies, then simulations
 
         self._read_config(kwargs)
-        self._load_data()
-        self._snip_dates(date_start, date_end)
+        if kwargs.get('ohlc') is not None:
+            self.ohlc = kwargs['ohlc']
+        else:
+            with instruments.timer('stock.load', self.symbol):
+                self._load_data(date_start, date_end)
+        if 'pct_ret' not in self.ohlc.columns:
+            with instruments.timer('stock.returns', self.symbol):
+                self._calc_returns()
+        with instruments.timer('stock.snip', self.symbol):
+            self._snip_dates(date_start, date_end)
+        if self.compact:
+            with instruments.timer('stock.compact', self.symbol):
+                self.ohlc = compact_ohlc(self.ohlc)
+        instruments.count('stock.bars', len(self.ohlc), self.symbol)
 
-        # The trade_log holds all transactions and position & PnL is calculated
+        # The ledger holds all transactions and position & PnL is calculated
         # from this data structure.
-        self.trade_log = pd.DataFrame(index=[self.ohlc.index[0],], dtype='float64')
-        self.trade_log['shares']      = 0       # shares held
-        self.trade_log['trade_price'] = 0       # price of shares at trade date
-        self.trade_log['trade_cost'] = 0        # total cost of trade
-        self.trade_log['cash_position'] = 0     # cash held at date
-        self.trade_log['share_value'] = 0       # value of shares at date
-        self.trade_log['book_value'] = 0        # cash + share value at date
+        self.ledger = TradeLedger(self.ohlc.index, self.ohlc['close'], self.compact)
+
+        # Factors computed by strategies, cached and shared between them
+        self.factors = FactorGraph(self, self.config.get('factors', {}).get('cache_size', 64))
+
+
+    @property
+    def ohlc(self):
+        """ OHLC DataFrame. After push_bar it is rebuilt from the bar buffer when read. """
+        if self._ohlc is None and self._bars is not None:
+            self._ohlc = self._bars.frame()
+        return self._ohlc
+
+
+    @ohlc.setter
+    def ohlc(self, ohlc):
+        self._ohlc = ohlc
+        self._bars = None
+
+
+    def push_bar(self, trade_date, **bar):
+        """
+        Append one bar after the last date, e.g. push_bar(date, open=..,
+        high=.., low=.., close=..), and pass it to every registered stream.
+        The bar, its return and a ledger slot are added in amortized O(1);
+        the OHLC DataFrame is not rebuilt until it is read. Return the
+        bar's integer position.
+        """
+        if self._bars is None:
+            self._bars = BarBuffer.from_frame(self._ohlc)
+
+        prev = self._bars.last(self.col_name)
+        bar.setdefault('pct_ret', bar[self.col_name] / prev - 1)
+
+        pos = self._bars.append(trade_date, bar)
+        self.ledger.append(trade_date, bar['close'])
+        self._ohlc = None
+
+        for stream in self.streams:
+            stream.on_bar(pos, trade_date, bar)
+        return pos
+
+
+    @property
+    def trade_log(self):
+        """ DataFrame view of the trade ledger, built on demand. """
+        return self.ledger.frame()
 
 
     def _read_config(self, kwargs):
@@ -49,13 +155,23 @@ class Stock:
 
         log_level     = self.config['logging']['log_level']
         self.logger   = get_logger(f'stock-{self.symbol}', log_level)
-        self.tick_ds  = self.config['data_source']['hdf5_file']
+        self.tick_ds  = self.config['data_source'].get('hdf5_file')
+        self.source   = open_source(self.config)
         self.col_name = self.config['data_map']['column_name']
+        self.columns  = load_columns(self.config)
+        self.compact  = kwargs.get('compact', self.config.get('memory', {}).get('compact', False))
+
+
+    def _load_data(self, date_start=None, date_end=None):
+        """
+        Load data from the configured data source. Date range and columns
+        are pushed down into the read when the backend supports it.
+        """
+        self.ohlc = self.source.load(self.symbol, date_start, date_end, self.columns)
 
 
-    def _load_data(self):
-        """ Load data from HDF5 source and create associated time series. """
-        self.ohlc = pd.read_hdf(self.tick_ds, key=f'/{self.symbol}')
+    def _calc_returns(self):
+        """ Create associated time series. """
         self.ohlc['pct_ret'] = self.ohlc[self.col_name].pct_change()
 
 
@@ -69,42 +185,105 @@ class Stock:
         """
         Make sure trade date is last date or a valid date in OHLC index.
         """
-        if not trade_date:
-            return self.ohlc.index[-1]
-        
-        if trade_date not in self.ohlc.index: 
-           raise Exception(f'{trade_date} not in time series') 
+        return self.ohlc.index[self.position(trade_date)]
+
+
+    def position(self, trade_date=None):
+        """
+        Integer position of trade_date in the OHLC index, found by binary
+        search of the ledger's sorted dates rather than a label lookup.
+        trade_date is a date string, Timestamp or datetime64, or already an
+        integer position, which is only range checked. An array or index of
+        these gives an array of positions. None is the last date; unlike
+        the old label lookup an empty string is not, and raises. Booleans
+        are rejected rather than taken as positions 0 and 1.
+        """
+        dates = self.ledger.dates
+        if trade_date is None:
+            return len(dates) - 1
+
+        if isinstance(trade_date, (bool, np.bool_)) or getattr(trade_date, 'dtype', None) == bool:
+            raise TypeError(f'{trade_date!r} is not a date or position')
+        if np.ndim(trade_date) == 0:
+            if isinstance(trade_date, (int, np.integer)):
+                if not -len(dates) <= trade_date < len(dates):
+                    raise Exception(f'{trade_date} not in time series')
+                return int(trade_date) % len(dates)
+            value = pd.Timestamp(trade_date)
+            try:
+                value = value.as_unit(self.ledger.unit, round_ok=False).asm8.view('int64')
+            except ValueError:              # finer than the index resolution
+                raise Exception(f'{trade_date} not in time series')
+            pos = int(dates.searchsorted(value))
+            if pos == len(dates) or dates[pos] != value:
+                raise Exception(f'{trade_date} not in time series')
+            return pos
+
+        values = trade_date if isinstance(trade_date, pd.Index) else np.asarray(trade_date)
+        if np.issubdtype(values.dtype, np.integer):
+            positions = np.asarray(values, dtype='int64')
+            bad = (positions < -len(dates)) | (positions >= len(dates))
+            positions = positions % max(len(dates), 1)
         else:
-            return trade_date
+            values = pd.DatetimeIndex(values)
+            converted = values.as_unit(self.ledger.unit)
+            exact = np.asarray(converted == values)
+            values = converted.asi8
+            positions = dates.searchsorted(values)
+            bad = (positions == len(dates)) | ~exact
+            bad[~bad] = dates[positions[~bad]] != values[~bad]
+        if bad.any():
+            raise Exception(f'{trade_date[bad.argmax()]} not in time series')
+        return positions
+
+
+    def fingerprint(self):
+        """ Hash of the OHLC data, recomputed only if the frame is replaced. """
+        if getattr(self, '_fingerprint_ohlc', None) is not self.ohlc:
+            self._fingerprint = fingerprint(self.ohlc)
+            self._fingerprint_ohlc = self.ohlc
+        return self._fingerprint
 
 
     def log_trade(self, trade_date, shares, price):
         '''
         Record traded share count and update cash position with trade
         cost. Keep cash position updated in a running manner.
-        '''       
-        if trade_date not in self.ohlc.index:
-            raise Exception(f'{trade_date} not in time series')
-        
-        trade_cost = (shares * price) * -1
-        self.trade_log.loc[trade_date,['shares', 'trade_price', 'trade_cost']] = [shares, price, trade_cost]
+        '''
+        self.ledger.log(self.position(trade_date), shares, price)
+
+
+    def log_trades(self, trade_dates, shares, prices):
+        '''
+        Record many trades at once. Same result as calling log_trade for
+        each date in order, but the running columns are rebuilt only once.
+        '''
+        self.ledger.log_many(self.position(trade_dates), shares, prices)
+
+
+    def reset_trades(self):
+        """ Clear the trade ledger so the stock can be simulated again. """
+        self.ledger.reset()
 
 
     def get_held_shares(self, trade_date=None):
         """ Return shares held at specific date """
-        trade_date = self._validate_trade_date(trade_date)
-        return self.trade_log['shares'].loc[:trade_date].sum()
+        pos = self.position(trade_date)
+        return self.ledger.held_at(pos)
+
 
-    
     def get_held_share_value(self, trade_date=None, ohlc_col='close'):
-        """ 
+        """
         Return dollar value of held shares at specified trade_date. Value
         is calculated as the current (or submitted trade_date) stock price
         """
-        trade_date = self._validate_trade_date(trade_date)
+        pos = self.position(trade_date)
 
-        share_count = self.trade_log.loc[:trade_date]['shares'].sum()
-        share_price = self.ohlc.loc[trade_date][ohlc_col]
+        share_count = self.ledger.held_at(pos)
+        if ohlc_col == 'close':
+            share_price = self.ledger.mark_price[pos]
+        else:
+            share_price = self.ohlc[ohlc_col].to_numpy()[pos]
         return (share_count * share_price)
 
 
@@ -112,31 +291,60 @@ class Stock:
         """
         Return cash position. This is the sum of all buy and sell transactions.
         """
-        trade_date = self._validate_trade_date(trade_date)
-        return self.trade_log['trade_cost'].loc[:trade_date].sum()
+        pos = self.position(trade_date)
+        return self.ledger.cash_at(pos)
+
 
-    
     def get_max_drawdown(self, trade_date=None):
         """
         Return max draw down of the ticker throught it traded period.
         """
-        trade_date = self._validate_trade_date(trade_date)
-
-        return self.trade_log.loc[:trade_date]['cash_position'].min()        
+        pos = self.position(trade_date)
+        return self.ledger.min_cash_at(pos)
 
 
     def calc_pnl(self, trade_date=None):
         """
         Calculate PnL based upon cash position and shares held
         """
-        trade_date = self._validate_trade_date(trade_date)
-        book_value = self.get_held_share_value(trade_date)
-        cash_position = self.get_cash_position(trade_date)
+        pos = self.position(trade_date)
+        book_value = self.ledger.held_at(pos) * self.ledger.mark_price[pos]
+        cash_position = self.ledger.cash_at(pos)
 
         pnl = book_value + cash_position
         return pnl
 
 
+    def get_performance(self, window=SHARPE_WINDOW, periods=TRADING_DAYS):
+        """
+        Return equity curve with PnL, drawdown, Sharpe and exposure at each
+        time tick. Calculated in one pass over the ledger, so this is cheaper
+        than calling calc_pnl or get_max_drawdown for every date.
+        """
+        held, cash = self.ledger.running()
+        index = self.ohlc.index
+        curve = equity_curve(pd.Series(held, index=index), pd.Series(cash, index=index),
+                             self.ohlc['close'], self.config['strategy']['max_position_risk'],
+                             window, periods)
+        return pd.DataFrame(curve, columns=metrics)
+
+
+    def memory_usage(self):
+        """
+        Return dict of bytes held by the date index, the OHLC columns, the
+        built signals, the cached factors and the trade ledger, and their
+        total. Frames share the index, it is counted once.
+        """
+        usage = {'bars': len(self.ohlc),
+                 'index': self.ohlc.index.nbytes,
+                 'ohlc': frame_bytes(self.ohlc),
+                 'signals': sum(frame_bytes(v) for v in dict.values(self.signals)),
+                 'factors': self.factors.nbytes,
+                 'ledger': self.ledger.nbytes}
+        usage['total'] = sum(v for k,v in usage.items() if k != 'bars')
+        return usage
+
+
     def calc_ror(self, trade_date=None):
         """
         Calculate the annual rate of return. This will be the percent return
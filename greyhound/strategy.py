@@ -1,10 +1,72 @@
 # strategy.py
 from abc import ABC, abstractmethod
-import pandas as pd
 import numpy as np
+from .cache import IndicatorCache
+from .factors import Column, EWM, MinMaxNorm, Sub
+from .instrument import instruments
+from .memory import compact_signals
 
 
 class Strategy(ABC):
+    """
+    Strategies read their parameters from the matching [strategy.<name>]
+    table of the stock config, falling back to the class defaults. Params
+    passed in directly win over both.
+
+    create_factors declares the strategy's factors as nodes of the stock's
+    factor graph (see factors.py). Nodes shared with other strategies or
+    parameter sets, e.g. an EWM of close with the same span, are computed
+    once per stock and served from its cache afterwards.
+
+    When the config has a [cache] directory the finished signal_df is also
+    kept on disk (see cache.py) and reused by later runs over unchanged
+    data and parameters.
+    """
+    name = None
+    defaults = {}
+
+    def __init__(self, stock_object, strategy_name, params=None):
+        self.stock_obj = stock_object
+        self.params = self.read_params(self.stock_obj.config, params)
+        self.factors = {}
+
+        symbol = self.stock_obj.symbol
+        cache = IndicatorCache.from_config(self.stock_obj.config)
+        with instruments.timer('strategy.cache_get', symbol):
+            self.signal_df = self._cached(cache) if cache else None
+        if self.signal_df is None:
+            self.create_factors()
+            with instruments.timer('strategy.factors', symbol):
+                self.signal_df = self.stock_obj.factors.frame(self.factors)
+            with instruments.timer('strategy.signal', symbol):
+                self.create_signal()
+            if cache:
+                with instruments.timer('strategy.cache_put', symbol):
+                    cache.put(self.cache_key, self.signal_df, symbol=symbol,
+                              strategy=self.name, params=self.params)
+        else:
+            instruments.count('strategy.cache_hits', 1, symbol)
+
+        if self.stock_obj.compact:
+            # Keep the signal only, and let go of the factors behind it
+            self.signal_df = compact_signals(self.signal_df)
+            self.stock_obj.factors.clear()
+
+        self.stock_obj.signals[strategy_name] = self.signal_df
+
+    def _cached(self, cache):
+        index = self.stock_obj.ohlc.index
+        self.cache_key = cache.key(self.stock_obj.symbol, self.name, self.params,
+                                   self.stock_obj.fingerprint(), index[0], index[-1])
+        return cache.get(self.cache_key, index)
+
+    @classmethod
+    def read_params(cls, config, params=None):
+        _params = dict(cls.defaults)
+        _config = config.get('strategy', {}).get(cls.name, {})
+        _params.update({k: v for k, v in _config.items() if k in cls.defaults})
+        _params.update(params or {})
+        return _params
 
     @abstractmethod
     def create_factors(self):
@@ -17,47 +79,38 @@ class Strategy(ABC):
 
 class EMA(Strategy):
 
-    def __init__(self, stock_object, strategy_name):
-        self.stock_obj = stock_object
-        self.signal_df = pd.DataFrame(index=self.stock_obj.ohlc.index, dtype='float64')
-
-        self.create_factors()
-        self.create_signal()
-
-        self.stock_obj.signals[strategy_name] = self.signal_df
+    name = 'ema'
+    defaults = {'window': 30, 'signal_factor': 1.1}
 
     def create_factors(self):
-        self.signal_df['ema'] = self.stock_obj.ohlc['close'].ewm(span=30).mean()
-        self.signal_df['histogram'] = self.stock_obj.ohlc['close'] - self.signal_df['ema']
-        self.signal_df['hist_norm'] = ((self.signal_df['histogram'] - self.signal_df['histogram'].min()) 
-                            / (self.signal_df['histogram'].max() - self.signal_df['histogram'].min()))
+        close = Column(name='close')
+        self.factors['ema'] = EWM(close, span=self.params['window'])
+        self.factors['histogram'] = Sub(close, self.factors['ema'])
+        self.factors['hist_norm'] = MinMaxNorm(self.factors['histogram'])
 
     def create_signal(self):
         hist_mean = self.signal_df['hist_norm'].mean()
-        self.signal_df['signal'] = np.where(self.signal_df['hist_norm'] >= (hist_mean * 1.1), -1.0, 0.0)
-        self.signal_df['signal'] = np.where(self.signal_df['hist_norm'] <= (hist_mean * 1.1), 1.0, 0.0)
+        factor = self.params['signal_factor']
+        self.signal_df['signal'] = np.where(self.signal_df['hist_norm'] >= (hist_mean * factor), -1.0, 0.0)
+        self.signal_df['signal'] = np.where(self.signal_df['hist_norm'] <= (hist_mean * factor), 1.0, 0.0)
 
 class MACD(Strategy):
 
-    def __init__(self, stock_object, strategy_name):
-        self.stock_obj = stock_object
-        self.signal_df = pd.DataFrame(index=self.stock_obj.ohlc.index, dtype='float64')
-
-        self.create_factors()
-        self.create_signal()
-
-        self.stock_obj.signals[strategy_name] = self.signal_df
+    name = 'macd'
+    defaults = {'macd_fast': 12, 'macd_slow': 26, 'macd_sig': 9,
+                'histogram_max': 0.3, 'histogram_min': -0.3}
 
     def create_factors(self):
-        self.signal_df['macd_fast'] = self.stock_obj.ohlc['close'].ewm(span=12).mean()
-        self.signal_df['macd_slow'] = self.stock_obj.ohlc['close'].ewm(span=26).mean()
-        self.signal_df['macd']      = self.signal_df['macd_fast'] - self.signal_df['macd_slow']
-        self.signal_df['macd_sig']  = self.signal_df['macd'].ewm(span=9).mean()
-        self.signal_df['histogram'] = self.signal_df['macd'] - self.signal_df['macd_sig']
-        
+        close = Column(name='close')
+        self.factors['macd_fast'] = EWM(close, span=self.params['macd_fast'])
+        self.factors['macd_slow'] = EWM(close, span=self.params['macd_slow'])
+        self.factors['macd']      = Sub(self.factors['macd_fast'], self.factors['macd_slow'])
+        self.factors['macd_sig']  = EWM(self.factors['macd'], span=self.params['macd_sig'])
+        self.factors['histogram'] = Sub(self.factors['macd'], self.factors['macd_sig'])
+
     def create_signal(self):
-        self.signal_df['signal'] = np.where(self.signal_df['histogram'] >= 0.3, -1.0, 0.0)
-        self.signal_df['signal'] = np.where(self.signal_df['histogram'] <= -0.3, 1.0, 0.0)
+        self.signal_df['signal'] = np.where(self.signal_df['histogram'] >= self.params['histogram_max'], -1.0, 0.0)
+        self.signal_df['signal'] = np.where(self.signal_df['histogram'] <= self.params['histogram_min'], 1.0, 0.0)
 
 class FastReturn(Strategy):
 
@@ -87,10 +140,10 @@ class StrategyFactory:
                 'fast-return': FastReturn
             }
 
-    def create_strategy(self, stock_obj, name):
+    def create_strategy(self, stock_obj, name, params=None):
         try:
             func = self.strategies[name]
-            return func(stock_obj, name)
         except KeyError:
             raise AssertionError("Strategy undefined")
+        return func(stock_obj, name, params=params)
 
@@ -0,0 +1,255 @@
+# streaming.py
+""" Bar by bar mode: incremental indicators and bar feeds. """
+import csv
+import math
+from abc import ABC, abstractmethod
+import time
+import numpy as np
+import pandas as pd
+from .strategy import EMA, MACD
+
+
+class IncrementalEWM:
+    """
+    Series.ewm(span=span).mean() one value at a time. Same recursion as
+    the pandas kernel (adjust=True, ignore_na=False), so the values match
+    the batch mean exactly.
+    """
+    def __init__(self, span):
+        self.decay    = 1.0 - 2.0 / (span + 1.0)
+        self.weighted = math.nan
+        self.old_wt   = 1.0
+        self.nobs     = 0
+
+    def update(self, value):
+        is_obs = value == value
+        if self.weighted == self.weighted:
+            self.old_wt *= self.decay
+            if is_obs:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + value) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_obs:
+            self.weighted = value
+
+        self.nobs += is_obs
+        return self.weighted if self.nobs else math.nan
+
+
+class BarBuffer:
+    """
+    Dated float64 columns that rows can be appended to in amortized O(1).
+    The arrays grow by doubling. frame() builds a DataFrame over views of
+    the filled part.
+    """
+    def __init__(self, columns, index=None, data=None):
+        self.columns    = list(columns)
+        index           = index if index is not None else pd.DatetimeIndex([])
+        self.index_name = index.name
+        self.unit       = index.unit
+        self.size       = len(index)
+        self.dates      = index.as_unit('ns').asi8.copy()
+        self.values     = {c: np.array(data[c] if data is not None else [], dtype='float64')
+                           for c in self.columns}
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df.columns, df.index, {c: df[c].to_numpy() for c in df.columns})
+
+    def __len__(self):
+        return self.size
+
+    def append(self, trade_date, row):
+        """ Add a row, missing columns are NaN. Return its position. """
+        if self.size == len(self.dates):
+            capacity = max(16, 2 * self.size)
+            self.dates = np.resize(self.dates, capacity)
+            self.values = {c: np.resize(v, capacity) for c, v in self.values.items()}
+
+        pos = self.size
+        self.dates[pos] = pd.Timestamp(trade_date).as_unit('ns').value
+        for c in self.columns:
+            self.values[c][pos] = row.get(c, math.nan)
+        self.size += 1
+        return pos
+
+    def last(self, column):
+        return self.values[column][self.size - 1] if self.size else math.nan
+
+    def frame(self):
+        index = pd.DatetimeIndex(self.dates[:self.size].view('datetime64[ns]'), name=self.index_name)
+        index = index.as_unit(self.unit)
+        return pd.DataFrame({c: self.values[c][:self.size] for c in self.columns}, index=index)
+
+
+class StreamingStrategy(ABC):
+    """
+    Strategy kept up to date one bar at a time. The bars the stock already
+    has are replayed on creation, after that Stock.push_bar calls on_bar
+    for each new bar, which costs O(1). stock.signals[name] holds the
+    signal DataFrame in the same layout as the batch strategy, built from
+    the buffers only when read.
+
+    Parameters are read as for the batch strategy of the same name.
+    """
+    batch = None
+    columns = []
+
+    def __init__(self, stock_object, strategy_name, params=None):
+        self.stock_obj     = stock_object
+        self.strategy_name = strategy_name
+        self.params        = self.batch.read_params(self.stock_obj.config, params)
+        self.signal        = math.nan       # signal of the latest bar
+        self.start()
+
+        ohlc = self.stock_obj.ohlc
+        self.buffer = BarBuffer(self.columns)
+        for trade_date, close in zip(ohlc.index, ohlc['close'].tolist()):
+            self.buffer.append(trade_date, self.update(close))
+        self.buffer.index_name = ohlc.index.name
+        self.buffer.unit = ohlc.index.unit
+
+        self.stock_obj.streams.append(self)
+        self.stock_obj.signals.defer(self.strategy_name, self.buffer.frame)
+
+    @classmethod
+    def restore(cls, stock_object, state):
+        """ Attach a strategy saved with state() to stock without replaying its bars. """
+        strategy = cls.__new__(cls)
+        strategy.__dict__.update(state)
+        strategy.stock_obj = stock_object
+        stock_object.streams.append(strategy)
+        stock_object.signals.defer(strategy.strategy_name, strategy.buffer.frame)
+        return strategy
+
+    def state(self):
+        """ Indicator state and signal buffers, everything but the stock. """
+        return {k: v for k, v in self.__dict__.items() if k != 'stock_obj'}
+
+    def on_bar(self, pos, trade_date, bar):
+        self.buffer.append(trade_date, self.update(bar['close']))
+        self.stock_obj.signals.defer(self.strategy_name, self.buffer.frame)
+
+    @abstractmethod
+    def start(self):
+        """ Reset the indicator state. """
+        pass
+
+    @abstractmethod
+    def update(self, close):
+        """ Advance the indicator state by one bar, return its row. """
+        pass
+
+
+class StreamingEMA(StreamingStrategy):
+    """
+    Streaming version of strategy.EMA. The batch strategy scales the
+    histogram by its minimum and maximum over all bars, which looks ahead.
+    Here they are the running minimum and maximum, as is the mean, so the
+    signal of each bar is the one the batch strategy gives on the last bar
+    of a series ending at that bar.
+    """
+    batch = EMA
+    columns = ['ema', 'histogram', 'hist_norm', 'signal']
+
+    def start(self):
+        self.ema = IncrementalEWM(self.params['window'])
+        self.hist_min = math.inf
+        self.hist_max = -math.inf
+        self.hist_sum = 0.0
+        self.hist_count = 0
+
+    def update(self, close):
+        ema = self.ema.update(close)
+        histogram = close - ema
+        if histogram == histogram:
+            self.hist_min = min(self.hist_min, histogram)
+            self.hist_max = max(self.hist_max, histogram)
+            self.hist_sum += histogram
+            self.hist_count += 1
+
+        # mean of the normalized histogram is the normalized mean
+        hist_range = self.hist_max - self.hist_min
+        if hist_range > 0:
+            hist_norm = (histogram - self.hist_min) / hist_range
+            hist_mean = (self.hist_sum / self.hist_count - self.hist_min) / hist_range
+        else:
+            hist_norm = hist_mean = math.nan
+
+        self.signal = 1.0 if hist_norm <= (hist_mean * self.params['signal_factor']) else 0.0
+        return {'ema': ema, 'histogram': histogram, 'hist_norm': hist_norm, 'signal': self.signal}
+
+
+class StreamingMACD(StreamingStrategy):
+    """ Streaming version of strategy.MACD, equal to it bar for bar. """
+    batch = MACD
+    columns = ['macd_fast', 'macd_slow', 'macd', 'macd_sig', 'histogram', 'signal']
+
+    def start(self):
+        self.fast = IncrementalEWM(self.params['macd_fast'])
+        self.slow = IncrementalEWM(self.params['macd_slow'])
+        self.sig  = IncrementalEWM(self.params['macd_sig'])
+
+    def update(self, close):
+        macd_fast = self.fast.update(close)
+        macd_slow = self.slow.update(close)
+        macd      = macd_fast - macd_slow
+        macd_sig  = self.sig.update(macd)
+        histogram = macd - macd_sig
+
+        self.signal = 1.0 if histogram <= self.params['histogram_min'] else 0.0
+        return {'macd_fast': macd_fast, 'macd_slow': macd_slow, 'macd': macd,
+                'macd_sig': macd_sig, 'histogram': histogram, 'signal': self.signal}
+
+
+streaming_strategies = {
+            'ema': StreamingEMA,
+            'macd': StreamingMACD,
+        }
+
+def create_streaming(stock_obj, name, params=None):
+    try:
+        func = streaming_strategies[name]
+    except KeyError:
+        raise AssertionError("Strategy undefined")
+    return func(stock_obj, name, params=params)
+
+
+def replay_frame(ohlc, date_start=None):
+    """ Yield (date, bar dict) for each row of an OHLC frame from date_start. """
+    ohlc = ohlc.loc[date_start:]
+    columns = [c for c in ohlc.columns if c != 'pct_ret']
+    for trade_date, row in zip(ohlc.index, ohlc[columns].itertuples(index=False)):
+        yield trade_date, dict(zip(columns, row))
+
+
+def read_bars(path, follow=False, poll=1.0):
+    """
+    Yield (date, bar dict) from a CSV bar feed, one bar per line with the
+    date in the first column and a header naming the others. With follow
+    the file is tailed like a live feed and new lines are yielded as they
+    are written.
+    """
+    with open(path, newline='') as fh:
+        header = next(csv.reader([fh.readline()]))
+
+        def parse(line):
+            row = next(csv.reader([line]))
+            return pd.Timestamp(row[0]), {k: float(v) for k, v in zip(header[1:], row[1:])}
+
+        partial = ''
+        while True:
+            line = partial + fh.readline()
+            if not line.endswith('\n'):
+                if not follow:
+                    if line.strip():
+                        yield parse(line)
+                    return
+                # wait for the writer to finish the line
+                partial = line
+                time.sleep(poll)
+                continue
+
+            partial = ''
+            if line.strip():
+                yield parse(line)
@@ -0,0 +1,137 @@
+# sweep.py
+import itertools
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from .simulation import Simulation, boundary_pass
+from .stock import Stock
+from .strategy import StrategyFactory
+from .utils import read_config
+from .applogger import get_logger
+
+
+def param_grid(grid):
+    """
+    Expand a dict of parameter name -> list of values into a list of dicts,
+    one per combination. Raise ValueError for a grid without combinations.
+    """
+    empty = [k for k, v in grid.items() if len(v) == 0]
+    if not grid or empty:
+        raise ValueError(f'empty parameter grid{": no values for " + ", ".join(empty) if empty else ""}')
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def sweep_symbol(symbol, date_start, date_end, config, strategy, combos):
+    """
+    Evaluate every parameter combination on one symbol. The OHLC is loaded
+    once and factors shared between combinations, such as exponential
+    means of the same span, come from the stock's factor graph cache.
+    Returns a list of result rows.
+    """
+    stock = Stock(symbol, date_start, date_end, config=config)
+    return sweep_stock(stock, strategy, combos)
+
+
+def sweep_stock(stock, strategy, combos):
+    """ Evaluate every parameter combination on an already loaded stock. """
+    strat_factory = StrategyFactory()
+    sim = Simulation(stock, engine='vector')
+
+    rows = []
+    for params in combos:
+        stock.reset_trades()
+        strat_factory.create_strategy(stock, strategy, params=params)
+        sim.paper_trade(strategy)
+        rows.append({'symbol': stock.symbol, **params,
+                     'pnl': stock.calc_pnl(),
+                     'max_drawdown': stock.get_max_drawdown(),
+                     'trades': stock.ledger.trade_count()})
+    return rows
+
+
+def threshold_search(stock, signal_name, buy_boundaries, sell_boundaries=None, column='signal'):
+    """
+    Evaluate a grid of signal boundaries on one of the stock's signals
+    without running a simulation per pair. column picks the series of
+    stock.signals[signal_name] to threshold, e.g. 'histogram'. Every buy
+    boundary is paired with every sell boundary; without sell boundaries
+    each buy boundary is also its own sell boundary, as in Simulation.
+    Returns DataFrame with a row per pair holding PnL, max drawdown and
+    trade count, the same values paper_trade gives for that pair.
+
+    Compact stocks keep only the signal column, so other columns need a
+    stock loaded without compact.
+    """
+    signal_df = stock.signals[signal_name]
+    if column not in signal_df.columns:
+        if stock.compact:
+            raise ValueError(f'{stock.symbol}: {signal_name} has no {column} column on a compact '
+                             f'stock, only signal is kept')
+        raise KeyError(column)
+    if sell_boundaries is None:
+        buy = sell = np.asarray(buy_boundaries, dtype='float64')
+    else:
+        buy, sell = (a.ravel() for a in np.meshgrid(buy_boundaries, sell_boundaries, indexing='ij'))
+
+    ohlc = stock.ohlc
+    col_name = stock.config['data_map']['column_name']
+    signal = signal_df[column].reindex(ohlc.index)
+    close = ohlc['close'].to_numpy()
+
+    held, cash, min_cash, trades = boundary_pass(signal.to_numpy(), ohlc[col_name].to_numpy(), close,
+                                                 stock.config['strategy']['max_position_risk'],
+                                                 buy, sell)
+    return pd.DataFrame({'buy_signal_boundary': buy, 'sell_signal_boundary': sell,
+                         'pnl': held * close[-1] + cash, 'max_drawdown': min_cash, 'trades': trades})
+
+
+def _sweep_task(task):
+    return sweep_symbol(*task)
+
+
+class ParameterSweep:
+    """
+    Run every combination of a parameter grid for a strategy against every
+    symbol in a list. Each symbol is one task on a process pool, so a
+    symbol's OHLC is read once and the work spreads across all cores.
+    """
+    def __init__(self, symbol_list, date_start, date_end, strategy, grid, **kwargs):
+
+        _config =  kwargs.get('config', {})
+        if type(_config) is not dict:
+            self.config = read_config(_config)
+        else:
+            self.config = _config
+
+        self.symbols    = list(symbol_list)
+        self.date_start = date_start
+        self.date_end   = date_end
+        self.strategy   = strategy
+        self.combos     = param_grid(grid)
+
+        log_level   = self.config['logging']['log_level']
+        self.logger = get_logger('sweep', log_level)
+
+
+    def run(self, processes=None):
+        """
+        Return DataFrame with one row per (symbol, params) holding PnL,
+        max drawdown and trade count.
+        """
+        tasks = [(symbol, self.date_start, self.date_end, self.config, self.strategy, self.combos)
+                 for symbol in self.symbols]
+        processes = min(processes or mp.cpu_count(), len(tasks))
+
+        rows = []
+        if processes <= 1:
+            for task in tasks:
+                rows.extend(_sweep_task(task))
+        else:
+            with mp.Pool(processes) as pool:
+                for result in pool.imap_unordered(_sweep_task, tasks):
+                    rows.extend(result)
+                    self.logger.info(f'{result[0]["symbol"].upper()}: swept {len(result)} combinations')
+
+        results = pd.DataFrame(rows)
+        return results.sort_values(['symbol'] + list(self.combos[0].keys()), ignore_index=True)
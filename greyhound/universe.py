@@ -1,17 +1,119 @@
 # universe.py
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import pandas as pd
+from .datasource import load_columns, open_source
+from .panel import Panel
+from .portfolio import PortfolioSimulation
+from .performance import equity_curve, metrics, SHARPE_WINDOW, TRADING_DAYS
+from .runner import BacktestRunner
 from .stock import Stock
 from .utils import iterate_basket, read_config
 from .applogger import get_logger
 
 
+class LazyStocks(MutableMapping):
+    """
+    Dict of symbol:Stock that loads a stock on first access. At most
+    max_resident stocks are kept, least recently used are dropped first.
+    Iterating items() or values() streams through the symbols, so memory
+    stays bounded however many symbols there are.
+
+    A dropped stock is reloaded fresh on next access, so trades logged on
+    it are lost. Keep results (e.g. from run_backtest) rather than stocks.
+
+    Stocks are loaded outside the lock, so threads load different symbols
+    at the same time. A thread asking for a symbol another one is loading
+    waits for that load rather than starting its own.
+    """
+    def __init__(self, symbols, loader, max_resident=None):
+        self._symbols     = list(dict.fromkeys(symbols))
+        self._loader      = loader
+        self._resident    = OrderedDict()
+        self._loading     = {}              # symbol -> Event set when its load ends
+        self._lock        = threading.RLock()
+        self.max_resident = max_resident
+
+    def __getitem__(self, symbol):
+        while True:
+            with self._lock:
+                if symbol in self._resident:
+                    self._resident.move_to_end(symbol)
+                    return self._resident[symbol]
+                if symbol not in self._symbols:
+                    raise KeyError(symbol)
+                loading = self._loading.get(symbol)
+                if loading is None:
+                    loading = self._loading[symbol] = threading.Event()
+                    break
+            loading.wait()
+
+        try:
+            stock = self._loader(symbol)
+            with self._lock:
+                if symbol in self._symbols:
+                    self._resident[symbol] = stock
+                    self._evict()
+        finally:
+            with self._lock:
+                del self._loading[symbol]
+            loading.set()
+        return stock
+
+    def __setitem__(self, symbol, stock):
+        with self._lock:
+            if symbol not in self._symbols:
+                self._symbols.append(symbol)
+            self._resident[symbol] = stock
+            self._resident.move_to_end(symbol)
+            self._evict()
+
+    def __delitem__(self, symbol):
+        with self._lock:
+            self._symbols.remove(symbol)
+            self._resident.pop(symbol, None)
+
+    def __iter__(self):
+        return iter(list(self._symbols))
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._symbols
+
+    def clear(self):
+        with self._lock:
+            self._symbols.clear()
+            self._resident.clear()
+
+    def resident(self):
+        """ Symbols currently loaded, least recently used first. """
+        return list(self._resident.keys())
+
+    def _evict(self):
+        while self.max_resident and len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+
+
 class Universe:
     """
     Create a 'basket'  of Stock object from list of symbols.
     Load data into dataframe inside stock objects.
+
+    With lazy=True (or [universe] lazy in the config) stocks are only
+    loaded when first accessed and at most max_resident of them are kept,
+    see LazyStocks.
+
+    compact=True (or [memory] compact) loads every stock in compact mode,
+    see Stock. memory_report() tells what each stock holds.
     """
     def __init__(self, symbol_list, date_start, date_end, **kwargs):
 
         self.stocks = {}
+        self.date_start = date_start
+        self.date_end   = date_end
 
         _config =  kwargs.get('config', {})
         if type(_config) is not dict:
@@ -19,12 +121,113 @@ class Universe:
         else:
             self.config = _config
 
+        if 'compact' in kwargs:
+            # Through the config, so stocks loaded later and in workers follow it
+            self.config = dict(self.config, memory=dict(self.config.get('memory', {}),
+                                                        compact=kwargs['compact']))
+
         log_level   = self.config['logging']['log_level']
         self.logger = get_logger(f'universe', log_level)
 
-        for symbol in symbol_list:
-            self.stocks[symbol] = Stock(symbol, date_start, date_end, config=self.config)
+        _universe = self.config.get('universe', {})
+        self.lazy = kwargs.get('lazy', _universe.get('lazy', False))
+        if self.lazy:
+            max_resident = kwargs.get('max_resident', _universe.get('max_resident'))
+            self.stocks = LazyStocks(symbol_list, self._load_stock, max_resident or None)
+            return
+
+        # Read through the data source and build the stocks while later symbols load
+        def add_stock(symbol, ohlc):
             self.logger.info(f'adding {symbol} to universe')
+            return Stock(symbol, date_start, date_end, config=self.config, ohlc=ohlc)
+
+        self.stocks.update(open_source(self.config).load_many(symbol_list,
+                                     date_start, date_end, load_columns(self.config),
+                                     post=add_stock, workers=kwargs.get('workers')))
+
+
+    def _load_stock(self, symbol):
+        self.logger.info(f'loading {symbol}')
+        return Stock(symbol, self.date_start, self.date_end, config=self.config)
+
+
+    def memory_report(self):
+        """
+        Return DataFrame by symbol of bytes held per stock, see
+        Stock.memory_usage. Lazy universes report resident stocks only.
+        """
+        symbols = self.stocks.resident() if self.lazy else list(self.stocks)
+        report = pd.DataFrame([self.stocks[s].memory_usage() for s in symbols],
+                              index=pd.Index(symbols, name='symbol'),
+                              columns=['bars', 'index', 'ohlc', 'signals', 'factors', 'ledger', 'total'])
+        self.logger.info(f'universe: {report.total.sum() / 2**20:.1f} MiB held by {len(report)} stocks')
+        return report
+
+
+    def bar_counts(self):
+        """
+        Return dict of ticker:bar count. Lazy universes read the counts from
+        store metadata rather than loading every stock.
+        """
+        if self.lazy:
+            return open_source(self.config).count_bars(list(self.stocks))
+        return {k: len(v.ohlc) for k,v in self.stocks.items()}
+
+
+    def run_backtest(self, strategy, backend=None, workers=None, params=None,
+                     engine=None, keep_ledger=False, callback=None, release=None):
+        """
+        Run strategy and paper trade every stock in the universe. Backend is
+        'serial', 'thread' or 'process', defaulting to [backtest] backend in
+        the config. 'thread' only pays off with the vector engine, see
+        BacktestRunner. Return dict of ticker:BacktestResult. callback, if
+        given, is called with each result as soon as it completes.
+
+        With the process backend the stocks in this universe are only
+        updated when keep_ledger is set, as trades are shipped back as
+        packed ledgers. release, default [backtest] release, empties the
+        universe once the prices are in shared memory; the ledgers then
+        only come back on the results.
+        """
+        _config = self.config.get('backtest', {})
+        backend = backend or _config.get('backend', 'process')
+        workers = workers or _config.get('workers') or None
+        release = _config.get('release', False) if release is None else release
+
+        runner = BacktestRunner(self, strategy, params, engine, keep_ledger, release)
+        results = {}
+        for result in runner.run(backend, workers):
+            results[result.symbol] = result
+            if result.error is not None:
+                self.logger.warning(f'{result.symbol} failed: {result.error}')
+            if callback:
+                callback(result)
+
+        return results
+
+
+    def create_strategy_panel(self, name, params=None):
+        """
+        Compute strategy for every stock at once on a dates x symbols panel
+        of closes. Each stock's signals[name] is filled in from the panel
+        the first time it is read. Return the Panel.
+        """
+        panel = Panel.from_stocks(self.stocks)
+        panel.run_strategy(name, self.config, params)
+        panel.scatter(self.stocks, name)
+        return panel
+
+
+    def run_portfolio(self, strategy, params=None, **kwargs):
+        """
+        Simulate every stock as one portfolio with shared capital and risk
+        limits (see PortfolioSimulation). Each stock's ledger is filled with
+        its portfolio trades. Return the portfolio's DataFrame by date.
+        """
+        portfolio = PortfolioSimulation(self, strategy, params, **kwargs)
+        curve = portfolio.run()
+        portfolio.scatter()
+        return curve
 
 
     def get_tickers(self):
@@ -59,3 +262,26 @@ class Universe:
             basket_pnl[k] = v.calc_pnl()
 
         return basket_pnl
+
+
+    def get_performance_panel(self, window=SHARPE_WINDOW, periods=TRADING_DAYS):
+        """
+        Return dates x symbols panel of per tick performance metrics. Columns
+        are a (metric, symbol) MultiIndex, so panel['pnl'] is the PnL of every
+        ticker at every date. Dates a ticker did not trade carry its last
+        position forward.
+        """
+        held, cash, price = {}, {}, {}
+        for k,v in self.stocks.items():
+            held[k], cash[k] = v.ledger.running()
+            held[k] = pd.Series(held[k], index=v.ohlc.index)
+            cash[k] = pd.Series(cash[k], index=v.ohlc.index)
+            price[k] = v.ohlc['close']
+
+        held  = pd.DataFrame(held).ffill().fillna(0)
+        cash  = pd.DataFrame(cash).ffill().fillna(0)
+        price = pd.DataFrame(price).ffill()
+
+        curve = equity_curve(held, cash, price, self.config['strategy']['max_position_risk'],
+                             window, periods)
+        return pd.concat([curve[m] for m in metrics], axis=1, keys=metrics)
@@ -0,0 +1,179 @@
+# walkforward.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .sharedmem import SharedOHLC
+from .simulation import Simulation, boundary_pass
+from .stock import Stock
+from .streaming import create_streaming
+from .sweep import param_grid
+from .universe import Universe
+
+
+def rolling_windows(n_bars, train, test, step=None):
+    """
+    Integer positions (train_start, test_start, test_stop) of rolling
+    walk forward folds over n_bars. Each fold trains on train bars and
+    tests on up to test bars right after them. Folds advance by step bars,
+    test by default, so the test slices follow each other without gaps.
+    """
+    step = step or test
+    windows = []
+    train_start = 0
+    while train_start + train < n_bars:
+        test_start = train_start + train
+        windows.append((train_start, test_start, min(test_start + test, n_bars)))
+        train_start += step
+    return windows
+
+
+def fold_signals(ohlc, symbol, config, strategy, params, window):
+    """
+    Signal DataFrame of the test slice of window. The streaming version of
+    the strategy is run over train and test bars, so its indicators are
+    warmed up on the train slice, and the signal of each test bar only
+    uses bars up to it: normalisations such as EMA's histogram min, max
+    and mean are running values rather than ones taken over the test
+    slice as well.
+    """
+    train_start, test_start, test_stop = window
+    warm = Stock(symbol, None, None, config=config, ohlc=ohlc.iloc[train_start:test_stop])
+    create_streaming(warm, strategy, params)
+    return warm.signals[strategy].iloc[test_start - train_start:]
+
+
+def train_scores(ohlc, symbol, config, strategy, combos, window):
+    """
+    DataFrame of PnL, max drawdown and trade count of every parameter
+    combination over the train slice of window. Each combination is scored
+    on the same causal streaming signals the test slice trades, replayed
+    from the start of the train slice, and all of them are sized in one
+    boundary_pass.
+    """
+    train_start, test_start, test_stop = window
+    train = (train_start, train_start, test_start)
+    signal = np.column_stack([fold_signals(ohlc, symbol, config, strategy, params, train)['signal']
+                              for params in combos])
+
+    _strategy = config['strategy']
+    boundary = _strategy['buy_signal_boundary']
+    close = ohlc['close'].to_numpy()[train_start:test_start]
+    spot = ohlc[config['data_map']['column_name']].to_numpy()[train_start:test_start]
+    held, cash, min_cash, trades = boundary_pass(signal, spot, close, _strategy['max_position_risk'],
+                                                 boundary, boundary)
+    return pd.DataFrame({'pnl': held * close[-1] + cash, 'max_drawdown': min_cash, 'trades': trades})
+
+
+def run_fold(ohlc, symbol, config, strategy, combos, window, metric='pnl'):
+    """
+    Pick the parameters scoring best on metric over the train slice, then
+    trade them over the test slice. Both slices trade signals built
+    without looking ahead (see fold_signals), so the train score is the
+    one of the signal that is traded. Slices are views of ohlc. Returns
+    the fold's row and its test PnL curve.
+    """
+    train_start, test_start, test_stop = window
+    scores = train_scores(ohlc, symbol, config, strategy, combos, window)
+    best = scores[metric].idxmax()
+    params = combos[best]
+
+    test = Stock(symbol, None, None, config=config, ohlc=ohlc.iloc[test_start:test_stop])
+    test.signals[strategy] = fold_signals(ohlc, symbol, config, strategy, params, window)
+    Simulation(test, engine='vector').paper_trade(strategy)
+
+    row = {'symbol': symbol, **params,
+           'train_start': ohlc.index[train_start], 'test_start': ohlc.index[test_start],
+           'test_end': ohlc.index[test_stop - 1],
+           f'train_{metric}': scores[metric].iloc[best],
+           'test_pnl': test.calc_pnl(),
+           'test_max_drawdown': test.get_max_drawdown(),
+           'test_trades': test.ledger.trade_count()}
+    return row, test.get_performance()['pnl']
+
+
+def stitch(curves):
+    """
+    Join test PnL curves of consecutive folds into one out of sample
+    curve. Each fold starts flat, so it is offset by the PnL carried from
+    the folds before it. Dates already covered by an earlier fold are
+    dropped.
+    """
+    stitched, offset = [], 0.0
+    for curve in curves:
+        if stitched:
+            curve = curve.loc[curve.index > stitched[-1].index[-1]]
+        if len(curve) == 0:
+            continue
+        stitched.append(curve + offset)
+        offset = stitched[-1].iloc[-1]
+    return pd.concat(stitched) if stitched else pd.Series(dtype='float64')
+
+
+# Per process state, set by the pool initializer
+_worker = {}
+
+def _init_worker(spec, config):
+    _worker['shared'] = SharedOHLC.attach(spec)
+    _worker['config'] = config
+
+def _run_shared_fold(symbol, strategy, combos, window, metric):
+    ohlc = _worker['shared'].frame(symbol)
+    return run_fold(ohlc, symbol, _worker['config'], strategy, combos, window, metric)
+
+
+class WalkForward:
+    """
+    Walk forward optimization of a strategy's parameters. Every symbol is
+    read from the store once. Its folds, rolling train/test windows over
+    the loaded bars, run in parallel on a process pool, with the OHLC
+    shared to the workers through shared memory.
+
+    Each fold scores the parameter grid on its train slice and trades the
+    best parameters on the test slice that follows. Both use the causal
+    signals of the streaming version of the strategy. run() returns a
+    DataFrame of folds and the stitched out of sample PnL curve of every
+    symbol, dates x symbols.
+    """
+    def __init__(self, symbol_list, date_start, date_end, strategy, grid,
+                 train=252, test=63, step=None, metric='pnl', **kwargs):
+
+        self.universe = Universe(symbol_list, date_start, date_end, **kwargs)
+        self.config   = self.universe.config
+        self.logger   = self.universe.logger
+        self.strategy = strategy
+        self.combos   = param_grid(grid)
+        self.train    = train
+        self.test     = test
+        self.step     = step
+        self.metric   = metric
+
+
+    def folds(self):
+        """ List of (symbol, window) of every fold. """
+        return [(symbol, window) for symbol, stock in self.universe.stocks.items()
+                for window in rolling_windows(len(stock.ohlc), self.train, self.test, self.step)]
+
+
+    def run(self, processes=None):
+        folds = self.folds()
+        processes = min(processes or os.cpu_count(), max(len(folds), 1))
+
+        if processes <= 1:
+            results = [run_fold(self.universe.stocks[symbol].ohlc, symbol, self.config,
+                                self.strategy, self.combos, window, self.metric)
+                       for symbol, window in folds]
+        else:
+            with SharedOHLC.create(self.universe.stocks) as shared:
+                with ProcessPoolExecutor(processes, initializer=_init_worker,
+                                         initargs=(shared.spec, self.config)) as pool:
+                    futures = [pool.submit(_run_shared_fold, symbol, self.strategy, self.combos,
+                                           window, self.metric) for symbol, window in folds]
+                    results = [future.result() for future in futures]
+        self.logger.info(f'walk forward: {len(folds)} folds over {len(self.universe.stocks)} symbols')
+
+        rows = [row for row, curve in results]
+        equity = {}
+        for symbol in self.universe.stocks:
+            equity[symbol] = stitch([curve for (row, curve), (k, window) in zip(results, folds) if k == symbol])
+        return pd.DataFrame(rows), pd.DataFrame(equity)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# test_benchmark.py
+
+import sys
+import os
+import copy
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.benchmark import compare, run_matrix, stages, write_synthetic_store
+
+def test_synthetic_store_is_deterministic(tmp_path):
+    write_synthetic_store(tmp_path / 'a.h5', 2, 100, seed=3)
+    symbols = write_synthetic_store(tmp_path / 'b.h5', 2, 100, seed=3)
+    for symbol in symbols:
+        a = pd.read_hdf(tmp_path / 'a.h5', symbol)
+        b = pd.read_hdf(tmp_path / 'b.h5', symbol)
+        assert a.equals(b)
+        assert len(a) == 100 and (a.high >= a.low).all()
+
+def test_matrix_and_compare(tmp_path):
+    results = run_matrix(tmp_path, bars=[200], symbols=[1, 2], repeat=1)
+    assert len(results['results']) == 2 * len(stages)
+
+    slower = copy.deepcopy(results)
+    slower['results'][0]['seconds'] = results['results'][0]['seconds'] * 2 + 1
+    report = compare(results, slower)
+    assert report.regression.tolist() == [True] + [False] * (len(report) - 1)
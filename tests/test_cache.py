@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# test_cache.py
+
+import sys
+import os
+import copy
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock
+from greyhound import StrategyFactory
+from greyhound.cache import IndicatorCache
+from greyhound.utils import read_config
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+config = read_config('../config.toml')
+strat_factory = StrategyFactory()
+
+def cached_config(tmp_path, max_bytes=None):
+    _config = copy.deepcopy(config)
+    _config['cache'] = {'directory': str(tmp_path), 'max_bytes': max_bytes}
+    return _config
+
+def test_cache_hit_matches_compute(tmp_path):
+    """ A signal read back from the cache should equal a fresh computation """
+    _config = cached_config(tmp_path)
+    first = Stock(symbol, date_start, date_end, config=_config)
+    strat_factory.create_strategy(first, 'macd')
+
+    second = Stock(symbol, date_start, date_end, config=_config)
+    strat_factory.create_strategy(second, 'macd')
+
+    assert len(IndicatorCache(tmp_path).entries()) == 1
+    pd.testing.assert_frame_equal(first.signals['macd'], second.signals['macd'], check_freq=False)
+
+def test_cache_key_changes_with_params(tmp_path):
+    """ Different params or date range should not reuse an entry """
+    _config = cached_config(tmp_path)
+    stock = Stock(symbol, date_start, date_end, config=_config)
+    strat_factory.create_strategy(stock, 'ema', params={'window': 10})
+    strat_factory.create_strategy(stock, 'ema', params={'window': 20})
+    stock = Stock(symbol, date_start, '2015-06-30', config=_config)
+    strat_factory.create_strategy(stock, 'ema', params={'window': 20})
+
+    assert len(IndicatorCache(tmp_path).entries()) == 3
+
+def test_cache_eviction(tmp_path):
+    """ Cache should stay within max_bytes """
+    _config = cached_config(tmp_path, max_bytes=20000)
+    stock = Stock(symbol, date_start, date_end, config=_config)
+    for window in [10, 20, 30]:
+        strat_factory.create_strategy(stock, 'ema', params={'window': window})
+
+    assert IndicatorCache(tmp_path).size() <= 20000
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# test_checkpoint.py
+
+import sys
+import os
+import copy
+import pandas as pd
+from pytest import approx
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.checkpoint import CheckpointStore
+from greyhound.utils import read_config
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_cutoff = '2015-06-30'
+date_end = '2015-12-31'
+
+config = read_config('../config.toml')
+
+def test_resume_matches_full_run(tmp_path):
+    """ Resuming from a checkpoint gives the same state as one full run """
+    for strategy in ['ema', 'macd']:
+        full = CheckpointStore(tmp_path / 'full').update(symbol, strategy, config, date_start, date_end)
+
+        checkpoints = CheckpointStore(tmp_path / 'nightly')
+        checkpoints.update(symbol, strategy, config, date_start, date_cutoff)
+        resumed = checkpoints.update(symbol, strategy, config, date_start, date_end)
+
+        pd.testing.assert_frame_equal(resumed.ohlc, full.ohlc, check_freq=False)
+        pd.testing.assert_frame_equal(resumed.signals[strategy], full.signals[strategy], check_freq=False)
+        pd.testing.assert_frame_equal(resumed.trade_log, full.trade_log, check_freq=False)
+
+def test_params_change_recomputes(tmp_path):
+    """ A checkpoint made with other parameters or settings is not used """
+    checkpoints = CheckpointStore(tmp_path)
+    checkpoints.update(symbol, 'macd', config, date_start, date_cutoff)
+    assert checkpoints.load(symbol, 'macd', config, date_start) is not None
+    assert checkpoints.load(symbol, 'macd', config, date_start, params={'macd_fast': 5}) is None
+    assert checkpoints.load(symbol, 'macd', config, '2015-02-01') is None
+
+    changed = copy.deepcopy(config)
+    changed['strategy']['max_position_risk'] *= 2
+    assert checkpoints.load(symbol, 'macd', changed, date_start) is None
+    changed = copy.deepcopy(config)
+    changed['data_map']['column_name'] = 'open'
+    assert checkpoints.load(symbol, 'macd', changed, date_start) is None
+
+def test_revised_data_recomputes(tmp_path, monkeypatch):
+    """ A revised last bar in the store means recomputing rather than resuming """
+    checkpoints = CheckpointStore(tmp_path)
+    stock = checkpoints.update(symbol, 'ema', config, date_start, date_cutoff)
+    last_date = stock.ledger.index[-1]
+
+    load = type(stock.source).load
+    def revised_load(self, *args, **kwargs):
+        ohlc = load(self, *args, **kwargs).copy()
+        ohlc.loc[ohlc.index == last_date, 'close'] *= 1.1
+        return ohlc
+    monkeypatch.setattr(type(stock.source), 'load', revised_load)
+
+    loaded = checkpoints.load(symbol, 'ema', config, date_start)
+    assert checkpoints._new_bars(loaded[0], date_end) is None
+    resumed = checkpoints.update(symbol, 'ema', config, date_start, date_end)
+    assert resumed.ohlc.close.loc[last_date] == approx(stock.ohlc.close.loc[last_date] * 1.1)
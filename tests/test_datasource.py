@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# test_datasource.py
+
+import sys
+import os
+import copy
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock
+from greyhound.datasource import HDF5Source, NpySource, load_many, load_ohlc
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+stock = Stock(symbol, date_start, date_end, config='../config.toml')
+full_ohlc = load_ohlc(stock.tick_ds, symbol)
+
+def test_table_store_pushdown(tmp_path):
+    """
+    Reading a table store with a date range should return the range plus
+    one bar of lookback, and only the asked for columns.
+    """
+    store = tmp_path / 'ohlc.h5'
+    full_ohlc.to_hdf(store, key=symbol, format='table')
+    ohlc = load_ohlc(store, symbol, date_start, date_end, columns=['close'])
+
+    assert list(ohlc.columns) == ['close']
+    assert len(ohlc) == len(stock.ohlc) + 1
+    assert ohlc.index[1:].equals(stock.ohlc.index)
+
+def test_load_many():
+    """ Bulk load should read every symbol through one store """
+    ohlc = load_many(stock.tick_ds, ['nvda', 'spy'], date_start, date_end)
+    assert list(ohlc.keys()) == ['nvda', 'spy']
+    assert ohlc['spy'].loc[date_start:date_end].index.equals(stock.ohlc.index)
+
+def test_npy_source(tmp_path):
+    """ The memory mapped npy backend reads the same bars as the HDF5 store """
+    source = NpySource({'npy_dir': str(tmp_path)})
+    source.write(symbol, full_ohlc)
+    assert source.count_bars([symbol]) == {symbol: len(full_ohlc)}
+
+    ohlc = source.load(symbol, date_start, date_end, columns=['close'])
+    assert list(ohlc.columns) == ['close']
+    assert ohlc.index[1:].equals(stock.ohlc.index.as_unit('ns'))
+
+    config = copy.deepcopy(stock.config)
+    config['data_source'] = {'backend': 'npy', 'npy_dir': str(tmp_path)}
+    npy_stock = Stock(symbol, date_start, date_end, config=config)
+    pd.testing.assert_frame_equal(npy_stock.ohlc, stock.ohlc, check_freq=False, check_index_type=False)
+
+def test_npy_matches_hdf5_at_edges(tmp_path):
+    """ Both backends agree on ranges outside the data and on exact boundary dates """
+    full_ohlc.to_hdf(tmp_path / 'ohlc.h5', key=symbol, format='table')
+    hdf5 = HDF5Source({'hdf5_file': str(tmp_path / 'ohlc.h5')})
+    npy = NpySource({'npy_dir': str(tmp_path / 'npy')})
+    npy.write(symbol, full_ohlc)
+
+    first, last = full_ohlc.index[0], full_ohlc.index[-1]
+    day = pd.Timedelta(1, 'D')
+    ranges = [(last + day, None), (None, first - day), (first - 10 * day, first - day),
+              (last, None), (None, first), (first, last), (first, first), (last, last),
+              (date_start, date_end), ('2015-01-03', '2015-01-04')]
+    for start, end in ranges:
+        expected = hdf5.load(symbol, start, end, ['close'])
+        ohlc = npy.load(symbol, start, end, ['close'])
+        assert ohlc.index.equals(expected.index), (start, end)
+        assert (ohlc.close.to_numpy() == expected.close.to_numpy()).all()
+    assert len(npy.load(symbol, last + day)) == 0
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# test_factors.py
+
+import sys
+import os
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock
+from greyhound import StrategyFactory
+from greyhound.factors import Column, EWM, Factor, FactorGraph
+from pytest import raises
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+stock = Stock(symbol, date_start, date_end, config='../config.toml')
+strat_factory = StrategyFactory()
+
+def test_identical_factors_share_key():
+    """ Factors declared the same way should be the same graph node """
+    assert EWM(Column(name='close'), span=12).key == EWM(Column(name='close'), span=12).key
+    assert EWM(Column(name='close'), span=12).key != EWM(Column(name='close'), span=26).key
+
+def test_factor_reuse_across_strategies():
+    """
+    MACD with a fast span equal to the EMA window should take that mean
+    from the cache rather than computing it again.
+    """
+    strat_factory.create_strategy(stock, 'ema', params={'window': 12})
+    misses = stock.factors.misses
+    strat_factory.create_strategy(stock, 'macd', params={'macd_fast': 12})
+
+    # close and the span 12 mean are cached, slow mean, macd, signal line
+    # and histogram are new
+    assert stock.factors.misses - misses == 4
+    assert stock.signals['ema'].ema.equals(stock.signals['macd'].macd_fast)
+
+def test_factor_cache_lru():
+    """ Cache should hold at most maxsize nodes """
+    graph = FactorGraph(stock, maxsize=2)
+    for span in [5, 10, 20]:
+        graph.evaluate(EWM(Column(name='close'), span=span))
+    assert len(graph) == 2
+
+def test_factor_without_compute():
+    """ A factor that does not implement compute fails when declared """
+    class Incomplete(Factor):
+        pass
+    with raises(TypeError):
+        Incomplete(Column(name='close'))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# test_ingest.py
+
+import sys
+import os
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.datasource import load_ohlc
+from greyhound.ingest import ingest
+
+def write_csv(path, rows):
+    with open(path, 'w') as fh:
+        fh.write('Date,Open,High,Low,Close,Volume\n')
+        for row in rows:
+            fh.write(','.join(str(v) for v in row) + '\n')
+
+bars = [
+    ('2020-01-03', 2, 3, 1, 2.5, 100),
+    ('2020-01-02', 1, 2, 1, 1.5, 100),
+    ('2020-01-02', 1, 2, 1, 1.6, 200),     # duplicate date, kept
+    ('2020-01-06', 3, 2, 4, 3.0, 100),     # high below low
+    ('not a date', 3, 4, 2, 3.0, 100),
+    ('2020-01-07', 3, 4, 2, -3.0, 100),    # negative price
+]
+
+def test_ingest_validates_and_dedupes(tmp_path):
+    write_csv(tmp_path / 'ABC.csv', bars)
+    store = tmp_path / 'ohlc.h5'
+    summary = ingest(tmp_path, store, workers=1)
+
+    row = summary.iloc[0]
+    assert (row.symbol, row.rows, row.invalid, row.duplicates, row.written) == ('abc', 6, 3, 1, 2)
+
+    ohlc = load_ohlc(store, 'abc')
+    assert list(ohlc.index) == [pd.Timestamp('2020-01-02'), pd.Timestamp('2020-01-03')]
+    assert ohlc.close.iloc[0] == 1.6
+    assert ohlc.index.name == 'date'
+
+def test_ingest_appends_new_bars(tmp_path):
+    write_csv(tmp_path / 'abc.csv', bars[:2])
+    store = tmp_path / 'ohlc.h5'
+    ingest(tmp_path, store, workers=1)
+
+    write_csv(tmp_path / 'abc.csv', bars[:2] + [('2020-01-08', 3, 4, 2, 3.5, 100)])
+    summary = ingest(tmp_path, store, workers=1)
+    assert summary.written.iloc[0] == 1
+    assert len(load_ohlc(store, 'abc', '2020-01-03', '2020-01-08')) == 3
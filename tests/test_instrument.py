@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# test_instrument.py
+
+import sys
+import os
+import copy
+import json
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock, Simulation, StrategyFactory, Universe
+from greyhound.instrument import Instruments, instruments
+from greyhound.utils import read_config
+
+def test_disabled_is_noop():
+    inst = Instruments()
+    with inst.timer('stage', 'aapl'):
+        inst.count('events')
+    assert inst.report() == {'stages': {}, 'symbols': {}, 'workers': {}, 'counters': {}}
+
+def instrumented_config():
+    config = copy.deepcopy(read_config('../config.toml'))
+    config['instrument'] = {'enabled': True}
+    return config
+
+def test_stock_stages(tmp_path):
+    instruments.clear()
+    instruments.configure(instrumented_config())
+    try:
+        stock = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml')
+        StrategyFactory().create_strategy(stock, 'ema')
+        Simulation(stock, 'vector').paper_trade('ema')
+    finally:
+        instruments.configure({})
+    assert not instruments.enabled
+
+    report = instruments.report()
+    for stage in ['stock.load', 'strategy.signal', 'simulation.vector']:
+        assert report['stages'][stage]['calls'] >= 1
+        assert stage in report['symbols']['aapl']
+    assert report['counters']['stock.bars'] == len(stock.ohlc)
+
+    text = instruments.prometheus()
+    assert 'greyhound_stage_seconds_total{stage="stock.load",symbol="aapl"}' in text
+    instruments.save(str(tmp_path / 'report.json'))
+    assert json.load(open(tmp_path / 'report.json'))['counters']['stock.bars'] == len(stock.ohlc)
+    instruments.clear()
+
+def test_merge_worker_snapshots():
+    worker, parent = Instruments(), Instruments()
+    worker.enabled = True
+    with worker.timer('runner.stock', 'msft'):
+        worker.count('runner.result_bytes', 100)
+    snapshot = worker.snapshot()
+    assert worker.report()['stages'] == {}
+
+    parent.merge(snapshot)
+    parent.merge(snapshot)
+    report = parent.report()
+    assert report['stages']['runner.stock']['calls'] == 2
+    assert report['counters']['runner.result_bytes'] == 200
+    assert report['workers'][str(snapshot['pid'])]['runner.stock']['calls'] == 2
+
+def test_process_workers_count_once():
+    """ Workers report only their own stats, not the ones inherited from the parent """
+    instruments.clear()
+    instruments.configure(instrumented_config())
+    try:
+        universe = Universe(['aapl', 'msft'], '2020-01-01', '2020-12-31', config=instrumented_config())
+        bars = sum(len(v.ohlc) for v in universe.stocks.values())
+        assert instruments.report()['counters']['stock.bars'] == bars
+
+        universe.run_backtest('ema', backend='process', workers=2)
+        report = instruments.report()
+    finally:
+        instruments.configure({})
+        instruments.clear()
+
+    # once loading in the parent, once building the stocks in the workers
+    assert report['counters']['stock.bars'] == 2 * bars
+    assert report['stages']['runner.shared_create']['calls'] == 1
+
+def test_stocks_leave_configuration_alone():
+    """ Building a stock without an [instrument] section does not turn instrumentation off """
+    instruments.clear()
+    instruments.configure(instrumented_config())
+    try:
+        Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml')
+        Universe(['msft'], '2020-01-01', '2020-12-31', config='../config.toml')
+        assert instruments.enabled
+        report = instruments.report()
+    finally:
+        instruments.configure({})
+        instruments.clear()
+    assert set(report['symbols']) == {'aapl', 'msft'}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# test_journal.py
+
+import sys
+import os
+import copy
+import logging
+import numpy as np
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock, Simulation, StrategyFactory
+from greyhound.applogger import get_logger
+from greyhound.journal import TradeJournal, TRADE, read_journal
+from greyhound.streaming import create_streaming, replay_frame
+from greyhound.utils import read_config
+
+def journal_config(directory, log_level='warning'):
+    config = copy.deepcopy(read_config('../config.toml'))
+    config['logging']['log_level'] = log_level
+    config['journal'] = {'directory': str(directory), 'batch_size': 16}
+    return config
+
+def journaled_stock(tmp_path, engine, log_level='warning', strategy='ema'):
+    config = journal_config(tmp_path / engine, log_level)
+    stock = Stock('aapl', '2020-01-01', '2020-12-31', config=config)
+    StrategyFactory().create_strategy(stock, strategy)
+    simulation = Simulation(stock, engine)
+    simulation.paper_trade(strategy)
+    simulation.journal.flush()
+    return stock, read_journal(tmp_path / engine)
+
+def test_loop_journal(tmp_path):
+    stock, events = journaled_stock(tmp_path, 'loop')
+    trades = events[events.event == 'trade']
+    ledger = stock.trade_log
+    assert len(trades) == len(ledger)
+    assert (trades.shares.to_numpy() == ledger.shares.to_numpy()).all()
+    assert (trades.date.to_numpy() == ledger.index.as_unit('ns').to_numpy()).all()
+    assert (trades.symbol == 'aapl').all()
+
+    checks = events[events.event == 'risk_check']
+    assert len(checks) == len(trades)
+    assert checks.price.isna().all() and not checks.risk.isna().any()
+
+def test_vector_journal_matches_loop(tmp_path):
+    """ Both engines journal the same risk checks and trades """
+    _, loop = journaled_stock(tmp_path, 'loop')
+    _, vector = journaled_stock(tmp_path, 'vector')
+    assert (vector.event == 'risk_check').sum() == (vector.event == 'trade').sum()
+    pd.testing.assert_frame_equal(loop, vector)
+
+def test_stream_journal_matches_vector(tmp_path):
+    """ Bars pushed with string dates journal the events of the vector engine """
+    _, vector = journaled_stock(tmp_path, 'vector', strategy='macd')
+    full = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml')
+    stock = Stock('aapl', '2020-01-01', '2020-06-30', config=journal_config(tmp_path / 'stream'))
+    simulation = Simulation(stock)
+    simulation.stream(create_streaming(stock, 'macd'))
+    for trade_date, bar in replay_frame(full.ohlc, '2020-07-01'):
+        stock.push_bar(str(trade_date.date()), **bar)
+    simulation.journal.flush()
+
+    stream = read_journal(tmp_path / 'stream')
+    pd.testing.assert_frame_equal(stream, vector)
+
+def test_journal_replaces_bar_logs(tmp_path, caplog):
+    """ With a journal the loop engine writes no per bar text logs """
+    with caplog.at_level(logging.INFO):
+        journaled_stock(tmp_path, 'loop', log_level='info')
+    assert not [r for r in caplog.records if r.name == 'simul-aapl']
+
+def test_truncated_batch_is_skipped(tmp_path):
+    journal = TradeJournal(tmp_path, batch_size=2)
+    for day in ['2020-01-02', '2020-01-03', '2020-01-06']:
+        journal.record(TRADE, pd.Timestamp(day), 'msft', 1, 10.0)
+    journal.flush()
+    assert len(read_journal(journal.path)) == 3
+
+    with open(journal.path, 'ab') as fh:
+        fh.write(np.uint32(5).tobytes() + b'\x00' * 7)
+    assert len(read_journal(journal.path)) == 3
+
+def test_get_logger_single_handler():
+    for level in ['info', 'debug', 'warning']:
+        logger = get_logger('journal-test', level)
+    assert len(logger.handlers) == 1
+    assert logger.level == logging.WARNING
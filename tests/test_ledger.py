@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# test_ledger.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from pytest import approx
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound.ledger import TradeLedger
+
+index = pd.bdate_range('2015-01-01', periods=20, name='date')
+close = np.linspace(100.0, 119.0, 20)
+# position: shares
+trades = {2: 50, 5: -50, 8: 56, 13: -56, 17: 56}
+
+def new_ledger():
+    return TradeLedger(index, close)
+
+def log_all(ledger, order):
+    for pos in order:
+        ledger.log(pos, trades[pos], close[pos])
+    return ledger
+
+def expected_running():
+    """ Shares held and cash at every position, summed by hand """
+    shares = np.zeros(len(index))
+    cost = np.zeros(len(index))
+    for pos, n in trades.items():
+        shares[pos] = n
+        cost[pos] = n * close[pos] * -1
+    return np.cumsum(shares), np.cumsum(cost)
+
+#------------------------------------#
+#   TradeLedger unit tests
+#------------------------------------#
+def test_log_in_order():
+    """ Running shares and cash after trades logged in date order """
+    ledger = log_all(new_ledger(), sorted(trades))
+    held, cash = expected_running()
+    positions = np.arange(len(index))
+
+    assert ledger.held_at(positions).tolist() == held.tolist()
+    assert ledger.cash_at(positions).tolist() == approx(cash.tolist())
+    assert ledger.trade_count() == len(trades)
+
+
+def test_log_out_of_order():
+    """ A trade logged before the last one rebuilds the running columns """
+    ordered = log_all(new_ledger(), sorted(trades))
+    ledger = log_all(new_ledger(), [8, 17, 2, 13, 5])
+
+    for name in ['shares', 'held_shares', 'cash_position', 'share_value', 'book_value']:
+        assert getattr(ledger, name).tolist() == approx(getattr(ordered, name).tolist())
+
+
+def test_log_replaces_same_date():
+    """ A second trade on a date replaces the first """
+    ledger = log_all(new_ledger(), sorted(trades))
+    ledger.log(8, 20, close[8])
+    held, cash = expected_running()
+
+    assert ledger.held_at(9) == held[9] - 36
+    assert ledger.cash_at(9) == approx(cash[9] + 36 * close[8])
+
+
+def test_log_many_matches_log():
+    """ log_many gives the same ledger as one log call per trade """
+    ledger = log_all(new_ledger(), sorted(trades))
+    bulk = new_ledger()
+    positions = np.array(sorted(trades))
+    bulk.log_many(positions, [trades[p] for p in positions], close[positions])
+
+    for name in TradeLedger.columns + ['held_shares', 'logged']:
+        assert getattr(bulk, name).tolist() == approx(getattr(ledger, name).tolist())
+
+
+def test_held_and_cash_between_trades():
+    """ Dates between and after trades carry the last running value """
+    ledger = log_all(new_ledger(), sorted(trades))
+    held, cash = expected_running()
+
+    assert ledger.held_at(0) == 0 and ledger.cash_at(0) == 0
+    assert ledger.held_at(3) == ledger.held_at(4) == held[2] == 50
+    assert ledger.cash_at(11) == approx(cash[8])
+    assert ledger.held_at(19) == 56
+    assert ledger.cash_at(19) == approx(cash[17])
+    assert ledger.min_cash_at(19) == approx(cash.min())
+
+
+def test_frame_layout():
+    """ frame() has the layout of the old DataFrame trade log """
+    ledger = log_all(new_ledger(), sorted(trades))
+
+    # the trade log as Stock kept it before the ledger: seeded with the
+    # first date, one row per trade date
+    old = pd.DataFrame(index=[index[0],], dtype='float64')
+    for col in TradeLedger.columns:
+        old[col] = 0.0
+    for pos, n in trades.items():
+        old.loc[index[pos], ['shares', 'trade_price', 'trade_cost']] = [n, close[pos], n * close[pos] * -1]
+
+    frame = ledger.frame()
+    assert list(frame.columns) == list(old.columns)
+    assert frame.index.equals(pd.DatetimeIndex(old.index).as_unit(frame.index.unit).rename('date'))
+    for col in ['shares', 'trade_price', 'trade_cost']:
+        assert frame[col].tolist() == approx(old[col].tolist())
+
+    held, cash = expected_running()
+    logged = [0] + sorted(trades)
+    assert frame['cash_position'].tolist() == approx(cash[logged].tolist())
+    assert frame['book_value'].tolist() == approx((cash + held * close)[logged].tolist())
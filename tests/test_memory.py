@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# test_memory.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from pytest import raises
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock, Simulation, StrategyFactory, Universe
+from greyhound.sweep import threshold_search
+
+def test_compact_stock():
+    full = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml')
+    stock = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml', compact=True)
+
+    assert stock.ohlc.close.dtype == 'float32'
+    assert stock.ohlc.pct_ret.dtype == 'float32'
+    assert np.allclose(stock.ohlc.close, full.ohlc.close, rtol=1e-6)
+    if 'volume' in stock.ohlc:
+        assert np.issubdtype(stock.ohlc.volume.dtype, np.integer)
+
+    StrategyFactory().create_strategy(full, 'ema')
+    StrategyFactory().create_strategy(stock, 'ema')
+    assert list(stock.signals['ema'].columns) == ['signal']
+    assert stock.signals['ema'].signal.dtype == 'int8'
+    assert len(stock.factors) == 0
+    assert stock.memory_usage()['total'] < full.memory_usage()['total']
+
+    Simulation(stock, 'vector').paper_trade('ema')
+    assert stock.ledger.trade_count() > 0
+    assert stock.memory_usage()['ledger'] < 0.6 * full.memory_usage()['ledger']
+
+    assert len(threshold_search(stock, 'ema', [0.5, 0.9])) == 2
+    with raises(ValueError, match='compact'):
+        threshold_search(stock, 'ema', [0.5], column='hist_norm')
+
+def test_compact_ledger_pnl():
+    """ The compact ledger gives the PnL of a ledger kept in float64 """
+    full = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml')
+    stock = Stock('aapl', '2020-01-01', '2020-12-31', config='../config.toml', compact=True)
+    full.ohlc = stock.ohlc.astype('float64')
+    full.ledger = type(stock.ledger)(full.ohlc.index, full.ohlc['close'])
+    for s in (full, stock):
+        StrategyFactory().create_strategy(s, 'ema')
+        Simulation(s, 'vector').paper_trade('ema')
+
+    assert stock.ledger.shares.dtype == 'float32'
+    assert stock.calc_pnl() == full.calc_pnl()
+    assert stock.get_max_drawdown() == full.get_max_drawdown()
+    pd.testing.assert_frame_equal(stock.trade_log, full.trade_log, check_dtype=False)
+
+def test_universe_memory_report():
+    universe = Universe(['aapl', 'msft'], '2020-01-01', '2020-12-31',
+                        config='../config.toml', compact=True)
+    assert universe.config['memory']['compact']
+    for stock in universe.stocks.values():
+        assert stock.compact
+
+    report = universe.memory_report()
+    assert list(report.index) == ['aapl', 'msft']
+    assert (report.total == report[['index', 'ohlc', 'signals', 'factors', 'ledger']].sum(axis=1)).all()
+    assert (report.bars > 0).all()
+
+def test_compact_panel_signals():
+    universe = Universe(['aapl', 'msft'], '2020-01-01', '2020-12-31',
+                        config='../config.toml', compact=True)
+    universe.create_strategy_panel('ema')
+    assert universe.stocks['aapl'].signals['ema'].signal.dtype == 'int8'
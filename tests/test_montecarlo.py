@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# test_montecarlo.py
+
+import sys
+import os
+import numpy as np
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import MonteCarlo
+from greyhound import Simulation
+from greyhound import Stock
+from greyhound import StrategyFactory
+from greyhound.montecarlo import block_bootstrap
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+def test_block_bootstrap_blocks():
+    """ Paths are made of runs of consecutive returns """
+    returns = np.arange(100.0)
+    paths = block_bootstrap(returns, 3, 50, 10, np.random.default_rng(0))
+    assert paths.shape == (50, 3)
+    assert (np.diff(paths[:10], axis=0) == 1).all()
+
+def test_historical_path_matches_simulation():
+    """ The real price path gives the same result as a simulation """
+    stock = Stock(symbol, date_start, date_end, config='../config.toml')
+    mc = MonteCarlo(stock, 'macd', seed=0)
+    result = mc.evaluate(mc.price[:, None])
+
+    StrategyFactory().create_strategy(stock, 'macd')
+    Simulation(stock, engine='vector').paper_trade('macd')
+    assert result['pnl'][0] == stock.calc_pnl()
+    assert result['max_drawdown'][0] == stock.get_max_drawdown()
+    assert result['trades'][0] == stock.ledger.trade_count()
+
+def test_run_is_seeded():
+    """ One row per path, repeatable with a seed """
+    stock = Stock(symbol, date_start, date_end, config='../config.toml')
+    first = MonteCarlo(stock, 'ema', n_paths=50, batch_size=20, seed=1).run()
+    second = MonteCarlo(stock, 'ema', n_paths=50, batch_size=20, seed=1).run()
+    assert len(first) == 50
+    assert first.equals(second)
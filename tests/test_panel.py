@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# test_panel.py
+
+import sys
+import os
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock
+from greyhound import StrategyFactory
+from greyhound import Universe
+
+symbols = ['nvda', 'spy']
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+universe = Universe(symbols, date_start, date_end, config='../config.toml')
+
+def check_panel_strategy(name):
+    universe.create_strategy_panel(name)
+    for symbol in symbols:
+        panel_df = universe.stocks[symbol].signals[name]
+
+        stock = Stock(symbol, date_start, date_end, config='../config.toml')
+        StrategyFactory().create_strategy(stock, name)
+        pd.testing.assert_frame_equal(panel_df, stock.signals[name], check_freq=False)
+
+def test_panel_ema_matches_stock():
+    """ Panel EMA should match the per stock strategy """
+    check_panel_strategy('ema')
+
+def test_panel_macd_matches_stock():
+    """ Panel MACD should match the per stock strategy """
+    check_panel_strategy('macd')
+
+def test_panel_signals_deferred():
+    """ Signals are only cut out of the panel when read """
+    universe.create_strategy_panel('ema')
+    signals = universe.stocks['spy'].signals
+    assert 'ema' in signals and 'ema' not in signals.keys()
+    assert signals['ema'].signal.size == len(universe.stocks['spy'].ohlc)
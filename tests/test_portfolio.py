@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# test_portfolio.py
+
+import sys
+import os
+from pytest import approx
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import PortfolioSimulation
+from greyhound import Universe
+
+symbols = ['nvda', 'spy']
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+universe = Universe(symbols, date_start, date_end, config='../config.toml')
+
+def test_unlimited_portfolio_matches_backtest():
+    """ Without shared limits each symbol trades as it does alone """
+    curve = universe.run_portfolio('ema', capital=0, max_gross_risk=0)
+    portfolio_pnl = {k: v.calc_pnl() for k,v in universe.stocks.items()}
+
+    universe.run_backtest('ema', backend='serial')
+    for k,v in universe.stocks.items():
+        assert portfolio_pnl[k] == approx(v.calc_pnl())
+    assert curve.pnl.iloc[-1] == approx(sum(portfolio_pnl.values()))
+
+def test_shared_capital_limit():
+    """ Buys never spend more cash than the portfolio has """
+    portfolio = PortfolioSimulation(universe, 'ema', capital=5000, max_gross_risk=0)
+    curve = portfolio.run()
+    assert (curve.cash_position + 5000).min() >= 0
+    assert (portfolio.held >= 0).all().all()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# test_results.py
+
+import sys
+import os
+from pytest import approx
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import BacktestResult
+from greyhound import ResultCollector
+from greyhound import Stock
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_end = '2015-01-31'
+trades = {
+    '2015-01-02': 50,
+    '2015-01-07': -50,
+    '2015-01-12': 56 }
+
+stock = Stock(symbol, date_start, date_end, config='../config.toml')
+for trade_date, shares in trades.items():
+    stock.log_trade(trade_date, shares, stock.ohlc.loc[trade_date]['close'])
+
+def test_result_from_stock():
+    """ Record should carry PnL, drawdown and trade count of the stock """
+    result = BacktestResult.from_stock(stock, keep_ledger=True)
+
+    assert result.pnl == approx(stock.calc_pnl())
+    assert result.trades == 3
+    assert result.ledger['shares'].tolist() == [50, -50, 56]
+
+def test_result_without_ledger():
+    """ Ledger is only packed when asked for """
+    assert BacktestResult.from_stock(stock).ledger is None
+
+def test_collector_totals():
+    """ Collector keeps running totals and counts failures """
+    collector = ResultCollector(total=2)
+    collector.add(BacktestResult.from_stock(stock))
+    collector.add(BacktestResult.failed('xyz', 'no data'))
+    summary = collector.summary()
+
+    assert summary['symbols'] == 2 and summary['failed'] == 1
+    assert summary['pnl'] == approx(stock.calc_pnl())
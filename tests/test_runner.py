@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# test_runner.py
+
+import sys
+import os
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Universe
+from greyhound.runner import chunk_by_cost
+
+symbols = ['nvda', 'spy']
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+universe = Universe(symbols, date_start, date_end, config='../config.toml')
+
+def backtest_pnl(backend):
+    results = universe.run_backtest('ema', backend=backend, workers=2, keep_ledger=True)
+    return {k: v.pnl for k,v in results.items()}
+
+serial_pnl = backtest_pnl('serial')
+
+def test_thread_backend_matches_serial():
+    assert backtest_pnl('thread') == serial_pnl
+
+def test_process_backend_matches_serial():
+    """ Process results and the ledgers shipped back should match serial run """
+    assert backtest_pnl('process') == serial_pnl
+    assert universe.stocks['spy'].calc_pnl() == serial_pnl['spy']
+
+def test_failed_symbol_reported():
+    """ An undefined strategy fails each symbol without raising """
+    results = universe.run_backtest('no-such-strategy', backend='serial')
+    assert all(v.error is not None for v in results.values())
+
+def test_chunk_by_cost():
+    """ Chunks should balance bar counts, heaviest chunk first """
+    chunks = chunk_by_cost({'a': 100, 'b': 60, 'c': 50, 'd': 10}, 2)
+    assert chunks == [['a', 'd'], ['b', 'c']] or chunks == [['b', 'c'], ['a', 'd']]
+
+def test_release_drops_parent_stocks():
+    """ With release the parent keeps no stocks, results still carry the ledgers """
+    released = Universe(symbols, date_start, date_end, config='../config.toml')
+    results = released.run_backtest('ema', backend='process', workers=2, keep_ledger=True, release=True)
+    assert len(released.stocks) == 0
+    assert {k: v.pnl for k,v in results.items()} == serial_pnl
+    assert all(v.ledger is not None for v in results.values())
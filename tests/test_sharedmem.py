@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# test_sharedmem.py
+
+import sys
+import os
+import numpy as np
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import SharedOHLC
+from greyhound import Universe
+
+symbols = ['nvda', 'spy']
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+
+universe = Universe(symbols, date_start, date_end, config='../config.toml')
+shared = SharedOHLC.create(universe.stocks)
+attached = SharedOHLC.attach(shared.spec)
+
+def test_shared_frame_matches_stock():
+    """ Attached frame should hold the same OHLC as the loaded stock """
+    for symbol in symbols:
+        assert attached.frame(symbol).equals(universe.stocks[symbol].ohlc)
+
+def test_shared_stock_is_view():
+    """ Stock built on the shared buffers should not copy prices """
+    stock = attached.stock('spy', universe.config)
+    assert np.shares_memory(stock.ohlc['close'].to_numpy(), attached.data)
+    assert stock.calc_pnl() == 0
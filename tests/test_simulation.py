@@ -8,6 +8,7 @@ app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
 sys.path.append(app_path)
 from greyhound import Stock
 from greyhound import Simulation
+from greyhound import StrategyFactory
 
 # create stock obj and load data
 symbol = 'spy'
@@ -62,3 +63,17 @@ def test_risk_check_sell():
     """
     assert 24 < sim._risk_check('sell', '2015-01-28') < 32
 
+
+def test_vector_engine_matches_loop():
+    """
+    The vector engine sizes trades in one pass over arrays. It should log
+    exactly the same trades as the date by date loop.
+    """
+    trade_logs = []
+    for engine in ['loop', 'vector']:
+        engine_stock = Stock(symbol, date_start, date_end, config='../config.toml')
+        StrategyFactory().create_strategy(engine_stock, 'ema')
+        Simulation(engine_stock, engine=engine).paper_trade('ema')
+        trade_logs.append(engine_stock.trade_log)
+
+    pd.testing.assert_frame_equal(trade_logs[0], trade_logs[1], check_freq=False)
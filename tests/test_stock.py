@@ -103,3 +103,46 @@ def test_calc_pnl():
         test_result.append(stock.calc_pnl(dt))
 
     assert test_result == approx([0.0, -136.9, -113.5, -274.6], rel=1)
+
+
+def test_get_performance():
+    """
+    Equity curve PnL should agree with calc_pnl at every date and the
+    running max drawdown should never recover.
+    """
+    perf = stock.get_performance()
+    pnl = [stock.calc_pnl(dt) for dt in stock.ohlc.index]
+
+    assert perf['pnl'].tolist() == approx(pnl)
+    assert perf['max_drawdown'].is_monotonic_decreasing
+
+
+def test_position():
+    """
+    Dates resolve to integer positions by binary search, and the query
+    methods take positions or arrays of them as well as dates.
+    """
+    index = stock.ohlc.index
+    assert stock.position('2015-01-12') == index.get_loc('2015-01-12')
+    assert stock.position(index[3]) == 3
+    assert stock.position(-1) == stock.position() == len(index) - 1
+    assert list(stock.position(['2015-01-02', '2015-01-07'])) == [index.get_loc(d) for d in ['2015-01-02', '2015-01-07']]
+
+    for bad in [True, False]:
+        try:
+            stock.position(bad)
+            assert False
+        except TypeError:
+            pass
+
+    for missing in ['2015-01-03', '2016-01-04', len(index), '']:
+        try:
+            stock.position(missing)
+            assert False
+        except Exception as e:
+            assert 'not in time series' in str(e)
+
+    positions = stock.position(index)
+    assert list(stock.calc_pnl(positions)) == approx([stock.calc_pnl(dt) for dt in index])
+    assert list(stock.get_max_drawdown(positions)) == approx([stock.get_max_drawdown(dt) for dt in index])
+    assert stock.get_held_shares(5) == stock.get_held_shares(index[5])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# test_streaming.py
+
+import sys
+import os
+import pandas as pd
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Stock
+from greyhound import Simulation
+from greyhound import StrategyFactory
+from greyhound.streaming import StreamingEMA, StreamingStrategy, create_streaming, replay_frame
+from pytest import raises
+
+symbol = 'spy'
+date_start = '2015-01-01'
+date_cutoff = '2015-06-30'
+date_end = '2015-12-31'
+
+def streamed_stock(name):
+    """ Load bars up to the cutoff, then push the rest one at a time """
+    full = Stock(symbol, date_start, date_end, config='../config.toml')
+    stock = Stock(symbol, date_start, date_cutoff, config='../config.toml')
+    strategy = create_streaming(stock, name)
+    Simulation(stock).stream(strategy)
+
+    for trade_date, bar in replay_frame(full.ohlc, '2015-07-01'):
+        stock.push_bar(trade_date, **bar)
+    return full, stock
+
+def test_push_bar_ohlc():
+    """ Pushed bars and their returns match the loaded series """
+    full, stock = streamed_stock('macd')
+    pd.testing.assert_frame_equal(stock.ohlc, full.ohlc, check_freq=False)
+
+def test_streaming_macd_matches_batch():
+    """ Streaming MACD and its trades equal the batch strategy and vector engine """
+    full, stock = streamed_stock('macd')
+    StrategyFactory().create_strategy(full, 'macd')
+    Simulation(full, engine='vector').paper_trade('macd')
+
+    pd.testing.assert_frame_equal(stock.signals['macd'], full.signals['macd'], check_freq=False)
+    pd.testing.assert_frame_equal(stock.trade_log, full.trade_log, check_freq=False)
+    assert stock.calc_pnl() == full.calc_pnl()
+
+def test_streaming_ema_last_bar():
+    """ Streaming EMA on the last bar matches batch EMA over the same bars """
+    full, stock = streamed_stock('ema')
+    StrategyFactory().create_strategy(full, 'ema')
+    last = stock.signals['ema'].iloc[-1]
+    assert abs(last.hist_norm - full.signals['ema'].hist_norm.iloc[-1]) < 1e-9
+    assert last.signal == full.signals['ema'].signal.iloc[-1]
+
+def test_streaming_strategy_needs_update():
+    """ A streaming strategy without update fails on creation, before replaying bars """
+    class Incomplete(StreamingStrategy):
+        batch = StreamingEMA.batch
+        def start(self):
+            pass
+    stock = Stock('spy', '2015-01-01', '2015-01-31', config='../config.toml')
+    with raises(TypeError):
+        Incomplete(stock, 'ema')
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# test_sweep.py
+
+import sys
+import os
+import copy
+from pytest import approx, raises
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import ParameterSweep
+from greyhound import Simulation
+from greyhound import Stock
+from greyhound import StrategyFactory
+from greyhound.sweep import threshold_search
+from greyhound.utils import read_config
+
+symbols = ['nvda', 'spy']
+date_start = '2015-01-01'
+date_end = '2015-12-31'
+grid = {'window': [10, 30], 'signal_factor': [1.0, 1.1]}
+
+sweep = ParameterSweep(symbols, date_start, date_end, 'ema', grid, config='../config.toml')
+results = sweep.run(processes=1)
+
+def test_sweep_row_count():
+    """ One row per symbol and parameter combination """
+    assert len(results) == 8
+
+def test_sweep_matches_single_run():
+    """ A sweep row should match a stand alone backtest with the same params """
+    stock = Stock('spy', date_start, date_end, config='../config.toml')
+    StrategyFactory().create_strategy(stock, 'ema', params={'window': 10, 'signal_factor': 1.1})
+    Simulation(stock).paper_trade('ema')
+
+    row = results.loc[(results.symbol == 'spy') & (results.window == 10) & (results.signal_factor == 1.1)]
+    assert row.pnl.iloc[0] == approx(stock.calc_pnl())
+
+def test_threshold_search_matches_simulation():
+    """ Each boundary of a threshold search matches a simulation run with it """
+    config = read_config('../config.toml')
+    stock = Stock('spy', date_start, date_end, config=config)
+    StrategyFactory().create_strategy(stock, 'macd')
+    boundaries = [-0.5, 0.5, 1.0]
+    search = threshold_search(stock, 'macd', boundaries)
+
+    for boundary, row in zip(boundaries, search.itertuples()):
+        _config = copy.deepcopy(config)
+        _config['strategy']['buy_signal_boundary'] = boundary
+        sim_stock = Stock('spy', date_start, date_end, config=_config)
+        StrategyFactory().create_strategy(sim_stock, 'macd')
+        Simulation(sim_stock, engine='vector').paper_trade('macd')
+
+        assert row.pnl == approx(sim_stock.calc_pnl())
+        assert row.max_drawdown == approx(sim_stock.get_max_drawdown())
+        assert row.trades == sim_stock.ledger.trade_count()
+
+def test_threshold_search_grid():
+    """ Separate buy and sell boundaries give one row per pair """
+    stock = Stock('spy', date_start, date_end, config='../config.toml')
+    StrategyFactory().create_strategy(stock, 'macd')
+    search = threshold_search(stock, 'macd', [0.0, 0.5, 1.0], [-1.0, -0.5], column='histogram')
+    assert len(search) == 6
+    assert list(search.sell_signal_boundary[:2]) == [-1.0, -0.5]
+
+def test_empty_grid_rejected():
+    """ A grid without combinations fails on construction rather than in run """
+    for grid in [{}, {'window': [], 'signal_factor': [1.1]}]:
+        with raises(ValueError, match='empty parameter grid'):
+            ParameterSweep(['spy'], '2015-01-01', '2015-12-31', 'ema', grid, config='../config.toml')
@@ -3,11 +3,14 @@
 
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
 sys.path.append(app_path)
 from greyhound import Stock
 from greyhound import Universe
+from greyhound.universe import LazyStocks
 
 symbols = ['nvda', 'spy']
 date_start = '2015-01-01'
@@ -47,3 +50,47 @@ def test_universe_obj_creation():
 
 def test_calc_basket_share_value():
     pass
+
+def test_performance_panel():
+    # Panel should hold one column per symbol for each metric and agree
+    # with the per stock PnL on the last date.
+    panel = universe.get_performance_panel()
+
+    assert list(panel['pnl'].columns) == symbols
+    assert panel['pnl'].iloc[-1].tolist() == \
+        [universe.stocks[k].calc_pnl() for k in symbols]
+
+def test_lazy_universe():
+    # Lazy universe loads on access and keeps only max_resident stocks
+    lazy = Universe(symbols, date_start, date_end, config='../config.toml',
+                    lazy=True, max_resident=1)
+    assert lazy.stocks.resident() == []
+
+    total_days = sum(len(v.ohlc) for v in lazy.stocks.values())
+    assert total_days == sum(len(v.ohlc) for v in universe.stocks.values())
+    assert lazy.stocks.resident() == ['spy']
+
+def test_lazy_loads_overlap():
+    # Threads load different symbols at once, and one symbol only once
+    barrier = threading.Barrier(2, timeout=5)
+    loads = []
+    def loader(symbol):
+        loads.append(symbol)
+        barrier.wait()
+        return symbol.upper()
+
+    stocks = LazyStocks(['aapl', 'msft'], loader)
+    with ThreadPoolExecutor(4) as pool:
+        loaded = list(pool.map(stocks.__getitem__, ['aapl', 'msft', 'aapl', 'msft']))
+    assert loaded == ['AAPL', 'MSFT', 'AAPL', 'MSFT']
+    assert sorted(loads) == ['aapl', 'msft']
+
+def test_lazy_universe_backtest():
+    # Backtest results should not depend on how stocks are loaded
+    lazy = Universe(symbols, date_start, date_end, config='../config.toml',
+                    lazy=True, max_resident=1)
+    eager = Universe(symbols, date_start, date_end, config='../config.toml')
+    for backend in ['serial', 'process']:
+        lazy_pnl = {k: v.pnl for k,v in lazy.run_backtest('ema', backend=backend).items()}
+        eager_pnl = {k: v.pnl for k,v in eager.run_backtest('ema', backend=backend).items()}
+        assert lazy_pnl == eager_pnl
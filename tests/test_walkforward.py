@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# test_walkforward.py
+
+import sys
+import os
+import pandas as pd
+import pytest
+app_path = os.path.join(os.path.expanduser('~/sandbox/greyhound/'))
+sys.path.append(app_path)
+from greyhound import Simulation, Stock, WalkForward
+from greyhound.streaming import create_streaming
+from greyhound.walkforward import fold_signals, rolling_windows
+
+symbols = ['nvda', 'spy']
+date_start = '2014-01-01'
+date_end = '2016-12-31'
+grid = {'window': [10, 30], 'signal_factor': [1.0, 1.1]}
+
+walk = WalkForward(symbols, date_start, date_end, 'ema', grid, train=252, test=63,
+                   config='../config.toml')
+folds, equity = walk.run(processes=1)
+
+def test_rolling_windows():
+    """ Test slices follow each other and the last one is cut at the end """
+    windows = rolling_windows(100, 50, 20)
+    assert windows == [(0, 50, 70), (20, 70, 90), (40, 90, 100)]
+
+def test_stitched_curve_covers_test_slices():
+    """ One stitched curve per symbol, from the first test date on """
+    spy = folds[folds.symbol == 'spy']
+    assert list(equity.columns) == symbols
+    assert equity['spy'].first_valid_index() == spy.test_start.iloc[0]
+    assert equity['spy'].iloc[-1] == spy.test_pnl.sum()
+
+def test_process_folds_match_serial():
+    """ Folds run on the process pool give the same results """
+    pool_folds, pool_equity = walk.run(processes=2)
+    pd.testing.assert_frame_equal(pool_folds, folds, check_dtype=False)
+    pd.testing.assert_frame_equal(pool_equity, equity, check_index_type=False, check_freq=False)
+
+def test_test_signals_do_not_look_ahead():
+    """ Changing later test prices leaves the signals of earlier test bars alone """
+    ohlc = Stock('spy', date_start, date_end, config='../config.toml').ohlc
+    window = (0, 252, 315)
+    params = {'window': 10, 'signal_factor': 1.1}
+    signals = fold_signals(ohlc, 'spy', walk.config, 'ema', params, window)
+
+    changed = ohlc.copy()
+    changed.iloc[282:315, changed.columns.get_loc('close')] *= 1.5
+    changed_signals = fold_signals(changed, 'spy', walk.config, 'ema', params, window)
+
+    assert len(signals) == 63
+    pd.testing.assert_frame_equal(signals.iloc[:30], changed_signals.iloc[:30])
+    assert not signals.iloc[30:].equals(changed_signals.iloc[30:])
+
+def test_train_scores_trade_the_streaming_signal():
+    """ The train score of the chosen parameters is the PnL of trading their streaming signal """
+    row = folds[folds.symbol == 'spy'].iloc[0]
+    params = {'window': row.window, 'signal_factor': row.signal_factor}
+    ohlc = Stock('spy', date_start, date_end, config='../config.toml').ohlc
+    train = Stock('spy', None, None, config=walk.config, ohlc=ohlc.iloc[:252])
+    create_streaming(train, 'ema', params)
+    Simulation(train, engine='vector').paper_trade('ema')
+    assert row.train_pnl == pytest.approx(train.calc_pnl())